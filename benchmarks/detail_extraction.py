@@ -0,0 +1,66 @@
+# Throughput of the detail-page engine against the saved fixtures in benchmarks/fixtures/.
+# Serves the fixtures locally, then times parsing alone and the full fetch + parse path
+# at several worker counts. Pages without static flags are counted, not sent to a browser.
+# Run from the repository root: python benchmarks/detail_extraction.py --urls 2000
+import argparse
+import glob
+import os
+import sys
+import threading
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from scripts.fixture_server import FIXTURES_DIR, serve  # noqa: E402
+from scripts.scrape_details import DetailExtractor, parse_detail_page  # noqa: E402
+
+
+def fixture_pages():
+    pages = {}
+    for path in sorted(glob.glob(os.path.join(FIXTURES_DIR, "*.html"))):
+        with open(path, encoding="utf-8") as f:
+            pages[os.path.splitext(os.path.basename(path))[0]] = f.read()
+    return pages
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--urls", type=int, default=2000)
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 4, 16, 32])
+    args = parser.parse_args()
+
+    pages = fixture_pages()
+    listing_ids = list(pages)
+
+    n = args.urls
+    base = f"http://127.0.0.1:{args.port}/nekretnine/prodaja-stanova/stan"
+    urls = [f"{base}/{listing_ids[i % len(listing_ids)]}?kid=4" for i in range(n)]
+
+    # parse only
+    t0 = time.perf_counter()
+    parsed = [parse_detail_page(url, pages[listing_ids[i % len(listing_ids)]]) for i, url in enumerate(urls)]
+    elapsed = time.perf_counter() - t0
+    needs_browser = sum(p is None for p in parsed)
+    print(f"parse only        : {n / elapsed:10.0f} pages/s ({needs_browser} of {n} need a browser)")
+
+    server = serve(args.port)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    try:
+        for workers in args.workers:
+            extractor = DetailExtractor(workers=workers, browsers=0, timeout=10)
+            t0 = time.perf_counter()
+            results = list(extractor.extract_all(urls))
+            elapsed = time.perf_counter() - t0
+            extractor.close()
+            assert len(results) == n
+            print(f"fetch + parse x{workers:<3}: {n / elapsed:10.0f} pages/s "
+                  f"({extractor.stats['static']} static, {extractor.stats['failed']} need a browser)")
+    finally:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
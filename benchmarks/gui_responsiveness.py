@@ -0,0 +1,109 @@
+# Event-loop responsiveness of the GUI while the model loads/trains and while predictions run.
+# A 5 ms QTimer probe records how late each tick fires; before the thread-pool workers, the window
+# was blocked for the whole train/predict time. Headless, run from the repository root:
+#   python benchmarks/gui_responsiveness.py [--fresh] [--predictions 50]
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PySide6 import QtCore, QtWidgets  # noqa: E402
+
+import gui.interface as interface  # noqa: E402
+from models.registry import ModelRegistry  # noqa: E402
+
+TICK_MS = 5
+
+
+class LagProbe(QtCore.QObject):
+    # how late each timer tick is delivered, i.e. how long the UI thread was unable to handle events
+    def __init__(self):
+        super().__init__()
+        self.timer = QtCore.QTimer(self)
+        self.timer.setTimerType(QtCore.Qt.TimerType.PreciseTimer)
+        self.timer.timeout.connect(self._tick)
+        self.lags = []
+        self._last = None
+
+    def start(self):
+        self.lags, self._last = [], time.perf_counter()
+        self.timer.start(TICK_MS)
+
+    def stop(self):
+        self.timer.stop()
+        return np.array(self.lags) * 1000
+
+    def _tick(self):
+        now = time.perf_counter()
+        self.lags.append(max(0.0, now - self._last - TICK_MS / 1000))
+        self._last = now
+
+
+def spin_until(condition, timeout=600):
+    # run the event loop until condition() holds
+    loop = QtCore.QEventLoop()
+    check = QtCore.QTimer()
+    check.timeout.connect(lambda: condition() and loop.quit())
+    check.start(1)
+    QtCore.QTimer.singleShot(int(timeout * 1000), loop.quit)
+    loop.exec()
+    check.stop()
+
+
+def report(name, lags_ms, seconds):
+    print(f"{name:<28}{seconds:>9.2f}s{np.percentile(lags_ms, 50):>10.2f}{np.percentile(lags_ms, 99):>10.2f}"
+          f"{lags_ms.max():>10.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--fresh", action="store_true", help="train instead of loading a stored artifact")
+    parser.add_argument("--predictions", type=int, default=50)
+    args = parser.parse_args()
+
+    app = QtWidgets.QApplication.instance() or QtWidgets.QApplication([])
+    probe = LagProbe()
+    print(f"{'phase':<28}{'wall':>10}{'p50 ms':>10}{'p99 ms':>10}{'max ms':>10}   (event-loop lag)")
+
+    # model load/train runs on the pool from the constructor on
+    probe.start()
+    t0 = time.perf_counter()
+    window = interface.ApartmentApp(ModelRegistry(tempfile.mkdtemp()) if args.fresh else None)
+    window.show()
+    spin_until(lambda: window.model is not None)
+    report("startup + model load", probe.stop(), time.perf_counter() - t0)
+
+    results = []
+    window._show_prediction_popup = lambda title, prediction, color="green": results.append(prediction)
+    window.size_le.setText("65")
+    window.floor_total_le.setText("5")
+
+    probe.start()
+    t0 = time.perf_counter()
+    for i in range(args.predictions):
+        window.poly_btn.click()
+        spin_until(lambda: len(results) > i)
+    report(f"{args.predictions} predictions", probe.stop(), time.perf_counter() - t0)
+
+    # what the old click handler did: the same work on the UI thread, blocking it throughout
+    # (a new registry, so the model comes from disk or training again rather than from memory)
+    apartment = window._collect_apartment()
+    window.registry = ModelRegistry(tempfile.mkdtemp()) if args.fresh else ModelRegistry()
+    t0 = time.perf_counter()
+    window._load_model().predict(apartment, interval=interface.INTERVAL)
+    blocked = time.perf_counter() - t0
+    print(f"{'old handler (UI blocked)':<28}{blocked:>9.2f}s{'':>20}{blocked * 1000:>10.2f}")
+
+    window.close()
+    app.quit()
+
+
+if __name__ == "__main__":
+    main()
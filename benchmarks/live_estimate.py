@@ -0,0 +1,100 @@
+# Latency of the GUI's live estimate, driven through the widgets headlessly.
+# Random form states are set field by field; each debounced update_estimate() is timed and binned,
+# split into cache misses (single-row model evaluation) and hits (LRU lookup). Also checks that
+# typing a value key by key is coalesced into one estimate by the debounce timer.
+# Run from the repository root: python benchmarks/live_estimate.py [--updates 5000]
+import argparse
+import os
+import random
+import sys
+import time
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+import pandas as pd  # noqa: E402
+from PySide6 import QtCore, QtWidgets  # noqa: E402
+from PySide6.QtTest import QTest  # noqa: E402
+
+import gui.interface as interface  # noqa: E402
+
+BINS_US = [25, 50, 100, 250, 500, 1000, 5000]
+
+
+def histogram(name, samples_us):
+    counts, _ = np.histogram(samples_us, bins=[0] + BINS_US + [np.inf])
+    print(f"\n{name}: n={len(samples_us)}, p50 {np.percentile(samples_us, 50):.1f} µs, "
+          f"p99 {np.percentile(samples_us, 99):.1f} µs, max {samples_us.max():.1f} µs")
+    edges = [f"<{b} µs" for b in BINS_US] + [f">={BINS_US[-1]} µs"]
+    for edge, count in zip(edges, counts):
+        print(f"  {edge:>10} {count:>7} {'#' * int(60 * count / max(counts.max(), 1))}")
+
+
+def spin_until(app, condition, timeout=600):
+    deadline = time.perf_counter() + timeout
+    while not condition() and time.perf_counter() < deadline:
+        app.processEvents(QtCore.QEventLoop.ProcessEventsFlag.AllEvents, 10)
+
+
+def random_state(window, rng):
+    # a random but valid form; areas repeat often enough to exercise the cache
+    for combo in (window.municipality_cb, window.rooms_cb, window.type_cb, window.condition_cb,
+                  window.heating_cb):
+        combo.setCurrentIndex(rng.randrange(combo.count()))
+    window.size_le.setText(str(rng.choice(range(25, 160, 5))))
+    window.floor_total_le.setText(str(rng.randint(1, 12)))
+    window.floor_cb.setCurrentIndex(rng.randrange(window.floor_cb.count()))
+    window.garage_cb.setChecked(rng.random() < 0.3)
+    window.parking_cb.setChecked(rng.random() < 0.5)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--updates", type=int, default=5000)
+    args = parser.parse_args()
+
+    app = QtWidgets.QApplication([])
+    window = interface.ApartmentApp()
+    window.show()
+    spin_until(app, lambda: window.model is not None)
+
+    # the single-row path must agree with the batch path
+    rng = random.Random(0)
+    random_state(window, rng)
+    apartment = window._collect_apartment()
+    batch = window.model.predict_batch(pd.DataFrame([apartment]))["Price_per_m2"].iloc[0]
+    print(f"predict_row vs predict_batch: |diff| = {abs(window.model.predict_row(apartment) - batch):.2e} EUR/m²")
+
+    # time the debounced slot itself, once per form state
+    window.estimate_timer.timeout.disconnect(window.update_estimate)
+    misses, hits = [], []
+    for _ in range(args.updates):
+        random_state(window, rng)
+        before = window._estimate.cache_info().misses
+        t0 = time.perf_counter()
+        window.update_estimate()
+        elapsed = (time.perf_counter() - t0) * 1e6
+        (misses if window._estimate.cache_info().misses > before else hits).append(elapsed)
+    window.estimate_timer.timeout.connect(window.update_estimate)
+
+    histogram("cache misses (model evaluated)", np.array(misses))
+    if hits:
+        histogram("cache hits", np.array(hits))
+    histogram("all updates", np.array(misses + hits))
+
+    # typing "123" then "4" with short pauses triggers one estimate per pause, not one per key
+    calls = []
+    window.estimate_timer.timeout.connect(lambda: calls.append(window.size_le.text()))
+    window.size_le.clear()
+    QTest.keyClicks(window.size_le, "123")
+    QTest.qWait(interface.DEBOUNCE_MS * 2)
+    QTest.keyClicks(window.size_le, "4")
+    QTest.qWait(interface.DEBOUNCE_MS * 2)
+    print(f"\n4 keystrokes in 2 bursts -> {len(calls)} estimates {calls}, label: {window.estimate_lbl.text()}")
+
+
+if __name__ == "__main__":
+    main()
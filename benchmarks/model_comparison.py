@@ -0,0 +1,56 @@
+# Linear, polynomial and gradient-boosting models on the same 80/20 split: accuracy, fit time
+# and batch-predict throughput. Run from the repository root: python benchmarks/model_comparison.py
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from sklearn.model_selection import train_test_split  # noqa: E402
+
+from models.evaluation import MODELS  # noqa: E402
+from models.streaming import TRAINING_COLUMNS  # noqa: E402
+from preprocessing.storage import read_table  # noqa: E402
+
+CLEAN_CSV = os.path.join(ROOT, "data", "processed", "serbian_apartments_clean.csv")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--csv", default=CLEAN_CSV)
+    parser.add_argument("--threads", type=int, default=None, help="boosting threads, default: every core")
+    parser.add_argument("--predict-rows", type=int, default=1_000_000,
+                        help="test rows are tiled up to this many for the throughput run")
+    args = parser.parse_args()
+
+    df = read_table(args.csv, columns=TRAINING_COLUMNS).dropna(subset=["Price_per_m2"]).reset_index(drop=True)
+    df_train, df_test = train_test_split(df, test_size=0.2, random_state=42)
+    y = df_test["Price_per_m2"].to_numpy(dtype=np.float64)
+    tiled = df_test.iloc[np.resize(np.arange(len(df_test)), args.predict_rows)]
+
+    print(f"{len(df_train)} training rows, {len(df_test)} test rows")
+    print(f"{'model':<12}{'RMSE':>10}{'R²':>8}{'fit s':>9}{'rows/s':>14}")
+    for name, (model_cls, params) in MODELS.items():
+        if name == "boosting":
+            params = {**params, "n_threads": args.threads}
+
+        t0 = time.perf_counter()
+        model = model_cls(**params).fit(df_train)
+        fit_seconds = time.perf_counter() - t0
+
+        resid = y - model.predict_batch(df_test)["Price_per_m2"].to_numpy()
+        rmse = np.sqrt(np.mean(resid ** 2))
+        r2 = 1 - np.sum(resid ** 2) / np.sum((y - y.mean()) ** 2)
+
+        t0 = time.perf_counter()
+        model.predict_batch(tiled)
+        rows_per_s = len(tiled) / (time.perf_counter() - t0)
+        print(f"{name:<12}{rmse:>10.1f}{r2:>8.3f}{fit_seconds:>9.2f}{rows_per_s:>14,.0f}")
+
+
+if __name__ == "__main__":
+    main()
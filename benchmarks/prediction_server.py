@@ -0,0 +1,100 @@
+# Load test for the HTTP prediction service: closed-loop clients posting single apartments
+# (or --bulk N per request) for a fixed time; reports p50/p99 latency, requests/s and how many
+# predict calls the server needed. Starts `main.py serve` itself unless --url is given.
+# Run from the repository root:
+#   python benchmarks/prediction_server.py --clients 64 --seconds 10
+#   python benchmarks/prediction_server.py --max-wait-ms 0      # coalescing only what is already queued
+import argparse
+import asyncio
+import os
+import random
+import subprocess
+import sys
+import time
+
+import aiohttp
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+APARTMENT = {"Price": 0, "Municipality": "Zvezdara", "Area_m2": 65.0, "Rooms": 3.0, "Floor": "II/5",
+             "Type": "Stara gradnja", "Condition": "Renovirano", "Heating": "CG",
+             "Parking_garage": 0, "Parking_outdoor": 1}
+
+
+def payload(rng, bulk):
+    records = [dict(APARTMENT, Area_m2=float(rng.randint(25, 150))) for _ in range(bulk)]
+    return records[0] if bulk == 1 else records
+
+
+async def wait_ready(session, url, timeout=600):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            async with session.get(f"{url}/health") as resp:
+                if resp.status == 200:
+                    return await resp.json()
+        except aiohttp.ClientError:
+            pass
+        await asyncio.sleep(0.2)
+    raise RuntimeError(f"server at {url} did not come up")
+
+
+async def client(session, url, bulk, stop_at, latencies, seed):
+    rng = random.Random(seed)
+    while time.monotonic() < stop_at:
+        t0 = time.perf_counter()
+        async with session.post(f"{url}/predict", json=payload(rng, bulk)) as resp:
+            resp.raise_for_status()
+            await resp.read()
+        latencies.append(time.perf_counter() - t0)
+
+
+async def load_test(url, clients, seconds, bulk):
+    connector = aiohttp.TCPConnector(limit=clients)
+    async with aiohttp.ClientSession(connector=connector) as session:
+        before = await wait_ready(session, url)
+        latencies = []
+        stop_at = time.monotonic() + seconds
+        t0 = time.perf_counter()
+        await asyncio.gather(*(client(session, url, bulk, stop_at, latencies, i) for i in range(clients)))
+        elapsed = time.perf_counter() - t0
+        after = await wait_ready(session, url)
+
+    latencies_ms = np.array(latencies) * 1000
+    batches = after["batches"] - before["batches"]
+    print(f"{clients} clients x {seconds}s, {bulk} apartment(s) per request, model {after['model']}")
+    print(f"requests     : {len(latencies)}  ({len(latencies) / elapsed:,.0f} req/s, "
+          f"{len(latencies) * bulk / elapsed:,.0f} apartments/s)")
+    print(f"latency      : p50 {np.percentile(latencies_ms, 50):.2f} ms, p99 {np.percentile(latencies_ms, 99):.2f} ms, "
+          f"max {latencies_ms.max():.2f} ms")
+    print(f"predict calls: {batches}  ({len(latencies) / max(batches, 1):.1f} requests per call)")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--url", help="test a running server instead of starting one")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--model", default="polynomial")
+    parser.add_argument("--max-wait-ms", type=float, default=5.0)
+    parser.add_argument("--clients", type=int, default=64)
+    parser.add_argument("--seconds", type=float, default=10)
+    parser.add_argument("--bulk", type=int, default=1)
+    args = parser.parse_args()
+
+    server = None
+    url = args.url
+    if url is None:
+        url = f"http://127.0.0.1:{args.port}"
+        server = subprocess.Popen([sys.executable, "main.py", "serve", "--model", args.model,
+                                   "--port", str(args.port), "--max-wait-ms", str(args.max_wait_ms)], cwd=ROOT)
+    try:
+        asyncio.run(load_test(url.rstrip("/"), args.clients, args.seconds, args.bulk))
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+# Peak RSS and time of ApartmentPreprocessor.fit_transform against the previous copy-heavy path
+# (transform_base copy -> transform_features copy -> get_dummies -> features copy, with fit
+# repeating the whole chain). Each variant runs in a fresh interpreter so peaks don't mix.
+# Run from the repository root: python benchmarks/preprocess_memory.py --rows 2000000
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from preprocessing.numeric_encoding import ApartmentPreprocessor  # noqa: E402
+from preprocessing.storage import read_table  # noqa: E402
+from scripts.scorebook import CONDITION_MAP  # noqa: E402
+
+CLEAN_CSV = os.path.join(ROOT, "data", "processed", "serbian_apartments_clean.csv")
+NUMERIC = ApartmentPreprocessor.NUMERIC_FEATURES
+
+
+class CopyingPreprocessor(ApartmentPreprocessor):
+    # the frame-copying transform this benchmark compares against
+    def _base(self, df):
+        df = df.copy()
+        df["Price"] = (
+            df["Price"].astype(str)
+            .str.replace(r"[€.]", "", regex=True)
+            .str.replace(",", ".", regex=False)
+            .str.replace(r"\s+", "", regex=True)
+        ).astype(float)
+        df["Area_m2"] = df["Area_m2"].astype(str).str.replace(",", ".").astype(float)
+        return df
+
+    def _features(self, df):
+        df = df.copy()
+        df["Floor_num"], df["Is_top_floor"], df["Negative_floor"] = self.decode_floors(df["Floor"])
+        df["Parking_garage"] = df["Parking_garage"].fillna(0).astype(int)
+        df["Parking_outdoor"] = df["Parking_outdoor"].fillna(0).astype(int)
+        df["Parking_effect"] = df["Parking_garage"] + df["Parking_outdoor"]
+        df["Type_str"] = df["Type"].astype(object).fillna("Ostalo")
+        df["Heating_str"] = df["Heating"].astype(object).fillna("Ostalo")
+        df["Condition"] = df["Condition"].astype(object).fillna("Ostalo").map(CONDITION_MAP)
+        df_encoded = pd.get_dummies(df, columns=["Type_str", "Heating_str"])
+        features = NUMERIC + [c for c in df_encoded.columns if c.startswith(("Type_str_", "Heating_str_"))]
+        return df_encoded[features].copy()
+
+    def _scored(self, df):
+        df = self._base(df)
+        df["Municipality_score"] = df["Municipality"].astype(object).map(self.municipality_score).fillna(0)
+        return self._features(df)
+
+    def fit_transform(self, df, scale=True):
+        base = self._base(df)
+        avg_prices = base.groupby("Municipality", observed=True)["Price"].mean().sort_values(ascending=False)
+        self.municipality_score = {mun: len(avg_prices) - rank for rank, mun in enumerate(avg_prices.index)}
+        fitted = self._scored(df)
+        mean, std = fitted[NUMERIC].mean(), fitted[NUMERIC].std(ddof=0)
+        out = self._scored(df)
+        out[NUMERIC] = (out[NUMERIC] - mean) / std
+        return out
+
+
+def peak_rss_mb():
+    # ru_maxrss is kilobytes on Linux, bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def run_child(impl, rows):
+    df_real = read_table(CLEAN_CSV, columns=ApartmentPreprocessor.INPUT_COLUMNS)
+    rng = np.random.default_rng(42)
+    df = df_real.iloc[rng.integers(0, len(df_real), size=rows)].reset_index(drop=True)
+    del df_real
+    before = peak_rss_mb()
+
+    prep = CopyingPreprocessor() if impl == "copying" else ApartmentPreprocessor()
+    t0 = time.perf_counter()
+    if impl == "fused":
+        prep.fit_transform_array(df)
+    else:
+        prep.fit_transform(df)
+    elapsed = time.perf_counter() - t0
+    print(json.dumps({"input_mb": before, "peak_mb": peak_rss_mb(), "seconds": elapsed}))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=2_000_000)
+    parser.add_argument("--child", choices=["copying", "fused"])
+    args = parser.parse_args()
+
+    if args.child:
+        run_child(args.child, args.rows)
+        return
+
+    print(f"{args.rows:,} rows")
+    print(f"{'path':<10}{'RSS before MB':>15}{'peak RSS MB':>13}{'added MB':>10}{'time s':>9}")
+    for impl in ["copying", "fused"]:
+        out = subprocess.run([sys.executable, __file__, "--rows", str(args.rows), "--child", impl],
+                             capture_output=True, text=True, check=True)
+        r = json.loads(out.stdout.strip().splitlines()[-1])
+        print(f"{impl:<10}{r['input_mb']:>15.0f}{r['peak_mb']:>13.0f}"
+              f"{r['peak_mb'] - r['input_mb']:>10.0f}{r['seconds']:>9.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+# Compares the per-row Location/Details parsing (Series.apply returning pd.Series, ast.literal_eval)
+# with the batch parsers in preprocessing/data_cleaning.py.
+# Run from the repository root: python benchmarks/raw_parsing.py --rows 500000
+import argparse
+import ast
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from preprocessing.data_cleaning import parse_details, parse_location  # noqa: E402
+
+BASIC_CSV = os.path.join(ROOT, "data", "raw", "serbian_apartments_basic.csv")
+
+
+# the original row-at-a-time implementations, kept here as the reference
+def split_location(location):
+    parts = [x.strip() for x in location.split(',')]
+    while len(parts) < 5:
+        parts.append('')
+    return pd.Series({
+        'City': parts[0] if parts[0] != '' else 'Ostalo',
+        'Municipality': parts[2] if parts[2] != '' else 'Ostalo',
+    })
+
+
+def split_details(details):
+    try:
+        details_list = ast.literal_eval(details)
+        area = details_list[0].replace(' m', '') if len(details_list) > 0 and details_list[0] != '' else None
+        rooms = details_list[1] if len(details_list) > 1 and details_list[1] != '' else None
+        floor = details_list[2] if len(details_list) > 2 and details_list[2] != '' else 'Ostalo'
+
+        if isinstance(rooms, str) and '+' in rooms:
+            rooms = float(rooms.replace('+', ''))
+        else:
+            rooms = float(rooms) if rooms is not None else None
+
+        return pd.Series({'Area_m2': area, 'Rooms': rooms, 'Floor': floor})
+    except:  # noqa: E722
+        return pd.Series({'Area_m2': None, 'Rooms': None, 'Floor': 'Ostalo'})
+
+
+def legacy(df):
+    return pd.concat([df["Location"].apply(split_location), df["Details"].apply(split_details)], axis=1)
+
+
+def batch(df):
+    # Neighbourhood has no counterpart in the old parser
+    return pd.concat([parse_location(df["Location"])[["City", "Municipality"]], parse_details(df["Details"])],
+                     axis=1)
+
+
+def assert_same(expected, actual):
+    # the legacy path produces object columns; compare values, not dtypes
+    pd.testing.assert_frame_equal(expected.astype(object).where(expected.notna(), None),
+                                  actual.astype(object).where(actual.notna(), None))
+
+
+def synthetic_scrape(df_real, rows, seed=42):
+    # resample real rows and mix in odd details the regex hands to the slow path
+    rng = np.random.default_rng(seed)
+    df = df_real.iloc[rng.integers(0, len(df_real), size=rows)].reset_index(drop=True)
+    odd = rng.random(rows) < 0.01
+    extras = np.array(["[]", "['55 m']", "['70 m', '4+', 'PR/3', 'extra']", "['80 m', 'n/a', 'I/4']",
+                       "[\"5'5 m\", '2.0', 'I/2']", "nan"], dtype=object)
+    df.loc[odd, "Details"] = extras[rng.integers(0, len(extras), size=odd.sum())]
+    return df
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=500_000)
+    args = parser.parse_args()
+
+    df_real = pd.read_csv(BASIC_CSV)
+    assert_same(legacy(df_real), batch(df_real))
+    print(f"Identical output on {BASIC_CSV} ({len(df_real)} rows)")
+
+    df = synthetic_scrape(df_real, args.rows)
+
+    t0 = time.perf_counter()
+    expected = legacy(df)
+    t_legacy = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    actual = batch(df)
+    t_batch = time.perf_counter() - t0
+
+    assert_same(expected, actual)
+    print(f"{args.rows:,} synthetic rows")
+    print(f"apply + pd.Series + literal_eval : {t_legacy:8.3f}s")
+    print(f"batch parse                      : {t_batch:8.3f}s  ({t_legacy / t_batch:.0f}x faster)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,48 @@
+# Hyperparameter sweep: one SVD per degree for all alphas vs a new PolynomialRegressionModel per setting.
+# Also checks the closed-form coefficients against sklearn's Ridge.
+# Run from the repository root: python benchmarks/ridge_sweep.py
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from models.polynomial_regression import PolynomialRegressionModel  # noqa: E402
+from models.ridge_sweep import DEFAULT_ALPHAS, sweep  # noqa: E402
+
+CLEAN_CSV = os.path.join(ROOT, "data", "processed", "serbian_apartments_clean.csv")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--degrees", type=int, nargs="+", default=[1, 2])
+    args = parser.parse_args()
+    alphas = DEFAULT_ALPHAS
+
+    t0 = time.perf_counter()
+    table = sweep(CLEAN_CSV, args.degrees, alphas)
+    t_sweep = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    naive_rmse = []
+    for degree in args.degrees:
+        for alpha in alphas:
+            model = PolynomialRegressionModel(csv_path=CLEAN_CSV, degree=degree, ridge_alpha=alpha).train()
+            y_pred = model.pipeline.predict(model.X_test)
+            naive_rmse.append(np.sqrt(np.mean((np.asarray(model.y_test) - y_pred) ** 2)))
+    t_naive = time.perf_counter() - t0
+
+    diff = np.max(np.abs(table["test_rmse"].to_numpy() - np.array(naive_rmse)))
+    settings = len(args.degrees) * len(alphas)
+    print(f"{settings} settings ({len(args.degrees)} degrees x {len(alphas)} alphas)")
+    print(f"naive loop : {t_naive:8.3f}s")
+    print(f"sweep      : {t_sweep:8.3f}s  ({t_naive / t_sweep:.0f}x faster)")
+    print(f"max |test RMSE difference| vs sklearn Ridge: {diff:.2e}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,228 @@
+# Scaling suite on synthetic listings (scripts/synthetic_listings.py): times cleaning,
+# ApartmentPreprocessor.fit_transform, fit and predict_batch of the linear and polynomial models, and the
+# whole raw CSV -> cleaned table -> fitted model -> predictions path, at 10k/100k/1M rows (10M on request).
+# From 1M rows the models train out of core from the cleaned table in chunks (chunksize/train_streaming),
+# as an in-memory degree-2 design matrix no longer fits. Each size runs in a fresh interpreter so peak
+# RSS isn't shared between sizes. Results are appended to
+# benchmarks/results/scaling.json under the current commit and compared with the previous commit's run,
+# so a slowdown shows up against the commit that caused it.
+# Run from the repository root:
+#   python benchmarks/scaling.py                          # 10k-1M, compared with the last commit benchmarked
+#   python benchmarks/scaling.py --rows 10M               # needs tens of GB for the in-memory cleaning
+#   python benchmarks/scaling.py --rows 10k,100k --baseline HEAD~3
+#   python benchmarks/scaling.py --rows 10k --no-save --fail-on-regression
+import argparse
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+RESULTS_JSON = os.path.join(ROOT, "benchmarks", "results", "scaling.json")
+SIZES = ["10k", "100k", "1M"]
+# from this many rows the models train from chunks of TRAIN_CHUNKSIZE rows read off disk
+STREAMING_ROWS = 1_000_000
+TRAIN_CHUNKSIZE = 200_000
+STAGES = ["generate", "clean", "fit_transform", "linear.fit", "linear.predict_batch", "polynomial.fit",
+          "polynomial.predict_batch", "end_to_end"]
+
+
+def parse_rows(text):
+    # "10k" -> 10_000, "1M" -> 1_000_000
+    text = text.strip()
+    scale = {"k": 1_000, "m": 1_000_000}.get(text[-1].lower(), 1)
+    return int(float(text[:-1] if scale > 1 else text) * scale)
+
+
+def peak_rss_mb():
+    # ru_maxrss is kilobytes on Linux, bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def git(*args):
+    return subprocess.run(["git", *args], cwd=ROOT, capture_output=True, text=True, check=True).stdout.strip()
+
+
+def best_of(repeat, fn):
+    # (fastest time, last result); repeats only pay off for the sizes where noise dominates
+    best, result = float("inf"), None
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - t0)
+    return best, result
+
+
+def run_child(rows, seed, repeat):
+    from models.evaluation import MODELS
+    from preprocessing.data_cleaning import clean
+    from preprocessing.numeric_encoding import ApartmentPreprocessor
+    from preprocessing.storage import read_table, write_table
+    from scripts.synthetic_listings import generate, write
+
+    streaming = rows >= STREAMING_ROWS
+
+    def fit(name, df, path):
+        # in memory from the frame, or out of core from the same rows written to `path`
+        model_cls, params = MODELS[name]
+        if streaming:
+            return model_cls(csv_path=path, chunksize=TRAIN_CHUNKSIZE, **params).train()
+        return model_cls(**params).fit(df)
+
+    timings = {"fit_mode": "streaming" if streaming else "in_memory"}
+    with tempfile.TemporaryDirectory() as tmp:
+        timings["generate"], (basic, details) = best_of(1, lambda: generate(rows, seed))
+        timings["clean"], (df, _) = best_of(repeat, lambda: clean(basic, details))
+        del basic, details
+        df = df.dropna(subset=["Price_per_m2"]).reset_index(drop=True)
+        timings["fit_transform"], _ = best_of(repeat, lambda: ApartmentPreprocessor().fit_transform(df))
+
+        # untimed: the streaming fits read the cleaned table from disk
+        clean_path = write_table(df, os.path.join(tmp, "training")) if streaming else None
+        for name in ["linear", "polynomial"]:
+            timings[f"{name}.fit"], model = best_of(repeat, lambda: fit(name, df, clean_path))
+            timings[f"{name}.predict_batch"], _ = best_of(repeat, lambda: model.predict_batch(df))
+        del df, model
+
+        basic_path, details_path = write(rows, os.path.join(tmp, "raw"), seed)
+
+        def end_to_end():
+            cleaned, _ = clean(read_table(basic_path, typed=False), read_table(details_path))
+            training = cleaned.dropna(subset=["Price_per_m2"])
+            path = write_table(training, os.path.join(tmp, "clean"))
+            return fit("polynomial", training, path).predict_batch(training)
+
+        timings["end_to_end"], _ = best_of(repeat, end_to_end)
+
+    timings["peak_rss_mb"] = peak_rss_mb()
+    print(json.dumps(timings))
+
+
+def load_results(path):
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {"runs": []}
+
+
+def save_run(path, run):
+    results = load_results(path)
+    results["runs"].append(run)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=1, ensure_ascii=False)
+    os.replace(tmp_path, path)
+
+
+def find_baseline(runs, commit, baseline=None):
+    # latest run of `baseline` (any ref git understands), or of the last other commit benchmarked
+    if baseline:
+        wanted = git("rev-parse", baseline)
+        matches = [run for run in runs if run["commit"] == wanted]
+    else:
+        matches = [run for run in runs if run["commit"] != commit]
+    return matches[-1] if matches else None
+
+
+def compare(current, previous, threshold):
+    # prints one row per size and stage; returns the (size, stage) pairs that grew by more than threshold
+    print(f"\nagainst {previous['commit'][:10]} {previous['subject']!r} ({previous['date']})")
+    if previous["machine"] != current["machine"]:
+        print("note: the baseline ran on a different machine, ratios are only indicative")
+    print(f"{'rows':>6}  {'stage':<26}{'before s':>10}{'after s':>10}{'ratio':>8}")
+    regressions = []
+    for size, timings in current["results"].items():
+        before = previous["results"].get(size, {})
+        for stage in STAGES + ["peak_rss_mb"]:
+            if stage not in timings or not before.get(stage):
+                continue
+            ratio = timings[stage] / before[stage]
+            flag = ""
+            if ratio > 1 + threshold:
+                flag = "  regressed"
+                regressions.append((size, stage))
+            elif ratio < 1 - threshold:
+                flag = "  improved"
+            print(f"{size:>6}  {stage:<26}{before[stage]:>10.3f}{timings[stage]:>10.3f}{ratio:>8.2f}{flag}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", default=",".join(SIZES), help="comma-separated sizes, e.g. 10k,100k,1M")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--repeat", type=int, default=3, help="best of N for sizes below 1M")
+    parser.add_argument("--results", default=RESULTS_JSON)
+    parser.add_argument("--baseline", help="commit to compare with, default: the last other commit benchmarked")
+    parser.add_argument("--threshold", type=float, default=0.10, help="ratio change reported as regressed/improved")
+    parser.add_argument("--no-save", action="store_true")
+    parser.add_argument("--fail-on-regression", action="store_true")
+    parser.add_argument("--child", type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        run_child(args.child, args.seed, args.repeat)
+        return
+
+    commit = git("rev-parse", "HEAD")
+    run = {
+        "commit": commit,
+        "subject": git("log", "-1", "--format=%s"),
+        # uncommitted changes make the numbers belong to no commit in particular
+        "dirty": bool(git("status", "--porcelain", "--untracked-files=no")),
+        "date": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "machine": {"platform": platform.platform(), "processor": platform.processor(), "cpus": os.cpu_count(),
+                    "python": platform.python_version()},
+        "seed": args.seed,
+        "results": {},
+    }
+
+    print(f"{commit[:10]} {run['subject']}{' (dirty)' if run['dirty'] else ''}")
+    print(f"{'rows':>6}" + "".join(f"{stage:>14}" for stage in ["clean", "fit_transform", "poly.fit",
+                                                                "end_to_end", "peak RSS MB"]))
+    failed = []
+    for size in args.rows.split(","):
+        rows = parse_rows(size)
+        # one run at 1M+ already takes long enough to be stable
+        repeat = args.repeat if rows < 1_000_000 else 1
+        out = subprocess.run([sys.executable, __file__, "--child", str(rows), "--seed", str(args.seed),
+                              "--repeat", str(repeat)], capture_output=True, text=True)
+        if out.returncode != 0:
+            # most likely out of memory at the largest size; keep the sizes that finished
+            print(f"{size:>6}  failed: {(out.stderr.strip().splitlines() or ['killed'])[-1]}")
+            failed.append(size)
+            continue
+        timings = json.loads(out.stdout.strip().splitlines()[-1])
+        run["results"][size] = timings
+        print(f"{size:>6}" + "".join(f"{timings[stage]:>14.3f}" for stage in ["clean", "fit_transform",
+                                                                               "polynomial.fit", "end_to_end"])
+              + f"{timings['peak_rss_mb']:>14.0f}")
+
+    runs = load_results(args.results)["runs"]
+    previous = find_baseline(runs, commit, args.baseline)
+    regressions = compare(run, previous, args.threshold) if previous else []
+    if previous is None:
+        print("\nno earlier run to compare with")
+
+    if not args.no_save and run["results"]:
+        save_run(args.results, run)
+        print(f"\nresults appended to {os.path.relpath(args.results, ROOT)}")
+    if failed:
+        sys.exit(f"{len(failed)} size(s) failed: {', '.join(failed)}")
+    if regressions and args.fail_on_regression:
+        sys.exit(f"{len(regressions)} stage(s) regressed against {previous['commit'][:10]} by more than "
+                 f"{args.threshold:.0%}")
+
+
+if __name__ == "__main__":
+    main()
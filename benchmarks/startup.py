@@ -0,0 +1,78 @@
+# Cold-start timings for the library modules and the GUI.
+# Each measurement runs in a fresh interpreter so import caches don't leak between runs.
+# Run from the repository root: python benchmarks/startup.py
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CLEAN_CSV = os.path.join(ROOT, "data", "processed", "serbian_apartments_clean.csv")
+
+MODULES = [
+    "preprocessing.numeric_encoding",
+    "models.linear_regression",
+    "models.polynomial_regression",
+]
+
+# the work these modules used to do at import time
+SIDE_EFFECTS = {
+    "preprocessing.numeric_encoding": (
+        "import tempfile, os\n"
+        "from preprocessing.numeric_encoding import encode_dataset\n"
+        "encode_dataset(CSV, os.path.join(tempfile.mkdtemp(), 'encoded.csv'))\n"
+    ),
+    "models.linear_regression": (
+        "from models.linear_regression import LinearRegressionModel\n"
+        "print(LinearRegressionModel(csv_path=CSV).train().evaluate(), file=sys.stderr)\n"
+    ),
+    "models.polynomial_regression": (
+        "from models.polynomial_regression import PolynomialRegressionModel\n"
+        "print(PolynomialRegressionModel(csv_path=CSV).train().evaluate(), file=sys.stderr)\n"
+    ),
+}
+
+GUI = (
+    "import os\n"
+    "os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')\n"
+    "from PySide6 import QtWidgets\n"
+    "app = QtWidgets.QApplication([])\n"
+    "from gui.interface import ApartmentApp\n"
+    "window = ApartmentApp()\n"
+    "window.show()\n"
+    "app.processEvents()\n"
+)
+
+
+def run_timed(body, repeat=5):
+    # time `body` inside a fresh interpreter, interpreter startup excluded
+    code = (
+        "import sys, time\n"
+        f"CSV = {CLEAN_CSV!r}\n"
+        "t0 = time.perf_counter()\n"
+        f"{body}"
+        "print(time.perf_counter() - t0)\n"
+    )
+    env = dict(os.environ, PYTHONPATH=ROOT)
+    samples = []
+    for _ in range(repeat):
+        out = subprocess.run([sys.executable, "-c", code], cwd=ROOT, env=env,
+                             capture_output=True, text=True, check=True)
+        samples.append(float(out.stdout.strip().splitlines()[-1]))
+    return statistics.median(samples)
+
+
+def main():
+    print(f"{'target':<40}{'import only':>14}{'with side effects':>20}")
+    for module in MODULES:
+        bare = run_timed(f"import {module}\n")
+        loaded = run_timed(f"import {module}\n" + SIDE_EFFECTS[module])
+        print(f"{module:<40}{bare * 1000:>12.1f}ms{loaded * 1000:>18.1f}ms")
+
+    bare = run_timed(GUI)
+    loaded = run_timed(GUI + SIDE_EFFECTS["models.polynomial_regression"])
+    print(f"{'gui.interface (window shown)':<40}{bare * 1000:>12.1f}ms{loaded * 1000:>18.1f}ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+# Load time, in-memory size and file size of the cleaned table as CSV, Parquet and Feather.
+# Run from the repository root: python benchmarks/storage.py --rows 1000000
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from preprocessing.numeric_encoding import ApartmentPreprocessor  # noqa: E402
+from preprocessing.storage import read_table, write_table  # noqa: E402
+
+CLEAN_CSV = os.path.join(ROOT, "data", "processed", "serbian_apartments_clean.csv")
+MODEL_COLUMNS = ApartmentPreprocessor.INPUT_COLUMNS + ["Price_per_m2"]
+
+
+def timed(fn, repeat=3):
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - t0)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    # resample the real cleaned rows up to the requested size
+    df_real = read_table(CLEAN_CSV, typed=False)
+    rng = np.random.default_rng(42)
+    df = df_real.iloc[rng.integers(0, len(df_real), size=args.rows)].reset_index(drop=True)
+
+    print(f"{args.rows:,} rows")
+    print(f"{'format':<9}{'file MB':>9}{'load all s':>12}{'load model cols s':>19}{'memory MB':>11}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for fmt in ["csv", "parquet", "feather"]:
+            path = write_table(df, os.path.join(tmp, f"clean_{fmt}"), fmt, typed=fmt != "csv")
+            size = os.path.getsize(path) / 1e6
+            t_all, loaded = timed(lambda: read_table(path, typed=fmt != "csv"))
+            t_cols, _ = timed(lambda: read_table(path, columns=MODEL_COLUMNS, typed=fmt != "csv"))
+            memory = loaded.memory_usage(deep=True).sum() / 1e6
+            label = fmt if fmt != "csv" else "csv*"
+            print(f"{label:<9}{size:>9.1f}{t_all:>12.3f}{t_cols:>19.3f}{memory:>11.1f}")
+    print("* csv loaded untyped, the way every stage read it before")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+# Out-of-core training vs the in-memory fit on the same rows: coefficient agreement, time, peak RSS.
+# Run from the repository root: python benchmarks/streaming_training.py --rows 2000000
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from models.polynomial_regression import PolynomialRegressionModel  # noqa: E402
+from models.streaming import TRAINING_COLUMNS  # noqa: E402
+from preprocessing.numeric_encoding import ApartmentPreprocessor  # noqa: E402
+from preprocessing.storage import read_table, write_table  # noqa: E402
+
+CLEAN_CSV = os.path.join(ROOT, "data", "processed", "serbian_apartments_clean.csv")
+
+
+def peak_rss_mb():
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def run_child(mode, path, chunksize):
+    t0 = time.perf_counter()
+    if mode == "streaming":
+        model = PolynomialRegressionModel(csv_path=path, chunksize=chunksize).train()
+    else:
+        # in-memory fit on every row (no train/test split), the fit streaming reproduces
+        model = PolynomialRegressionModel(csv_path=path)
+        df = read_table(path, columns=TRAINING_COLUMNS)
+        model.prep = ApartmentPreprocessor()
+        X = model.prep.fit_transform_array(df)
+        model.pipeline = model._new_pipeline().fit(X, df["Price_per_m2"].to_numpy(dtype=np.float64))
+    elapsed = time.perf_counter() - t0
+    ridge = model.pipeline.named_steps["ridge"]
+    print(json.dumps({"seconds": elapsed, "peak_mb": peak_rss_mb(),
+                      "coef": ridge.coef_.tolist(), "intercept": float(ridge.intercept_)}))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=2_000_000)
+    parser.add_argument("--chunksize", type=int, default=100_000)
+    parser.add_argument("--child", choices=["in-memory", "streaming"])
+    parser.add_argument("--path")
+    args = parser.parse_args()
+
+    if args.child:
+        run_child(args.child, args.path, args.chunksize)
+        return
+
+    df_real = read_table(CLEAN_CSV, typed=False)
+    rng = np.random.default_rng(42)
+    df = df_real.iloc[rng.integers(0, len(df_real), size=args.rows)].reset_index(drop=True)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = write_table(df, os.path.join(tmp, "clean"))
+        del df
+        results = {}
+        for mode in ["in-memory", "streaming"]:
+            out = subprocess.run([sys.executable, __file__, "--child", mode, "--path", path,
+                                  "--chunksize", str(args.chunksize)],
+                                 capture_output=True, text=True, check=True)
+            results[mode] = json.loads(out.stdout.strip().splitlines()[-1])
+
+    print(f"{args.rows:,} rows, chunks of {args.chunksize:,}")
+    for mode, r in results.items():
+        print(f"{mode:<10} {r['seconds']:8.2f}s  peak RSS {r['peak_mb']:8.0f} MB")
+    coef_diff = np.max(np.abs(np.array(results["in-memory"]["coef"]) - np.array(results["streaming"]["coef"])))
+    intercept_diff = abs(results["in-memory"]["intercept"] - results["streaming"]["intercept"])
+    print(f"max |coef difference| {coef_diff:.3e}, |intercept difference| {intercept_diff:.3e}")
+
+
+if __name__ == "__main__":
+    main()
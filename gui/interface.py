@@ -1,28 +1,51 @@
 from PySide6 import QtCore, QtGui, QtWidgets
 import sys
-import pandas as pd
+from functools import lru_cache
 from PySide6.QtCore import Qt
 
-from scripts.scorebook import ROMAN_MAP
-from models.polynomial_regression import PolynomialRegressionModel
+from gui.workers import submit
+from scripts.instrumentation import span
+from scripts.paths import CLEAN_CSV
+from preprocessing.metadata import floor_options, load_metadata, write_metadata
+
+# bootstrap refits behind the price range shown with each estimate
+INTERVAL = 0.9
+# live estimate: recompute this long after the last edit, memoize this many distinct inputs
+DEBOUNCE_MS = 150
+ESTIMATE_CACHE_SIZE = 4096
 
 
 class ApartmentApp(QtWidgets.QWidget):
-    def __init__(self):
+    def __init__(self, registry=None):
         super().__init__()
         self.setWindowTitle("Belgrade Apartment Price Estimator")
-        self.setFixedSize(460, 580)
+        self.setFixedSize(460, 640)
+        # created on the worker thread with the model, so pandas/sklearn never load on the UI thread
+        self.registry = registry
+        self.pool = QtCore.QThreadPool.globalInstance()
+        # model and pending jobs; the button stays disabled until the model is ready
+        self.model = None
+        self._jobs = set()
         self._load_data()
         self._build_ui()
         self._apply_styles()
+        self._start_model_load()
 
     def _load_data(self):
-        df = pd.read_csv("../data/processed/serbian_apartments_clean.csv")
-        self.municipalities = df["Municipality"].dropna().unique().tolist()
-        self.rooms = sorted(df["Rooms"].dropna().astype(float).unique().tolist())
-        self.types = df["Type"].dropna().unique().tolist()
-        self.condition = df["Condition"].dropna().unique().tolist()
-        self.heating = df["Heating"].dropna().unique().tolist()
+        # combo-box values and floor lists from the metadata the training run wrote
+        metadata = load_metadata(CLEAN_CSV)
+        if metadata is None:
+            # no model trained on this data yet: summarize it once (this path imports pandas)
+            metadata = write_metadata(CLEAN_CSV)
+        vocabularies = metadata["vocabularies"]
+        self.municipalities = vocabularies["Municipality"]
+        self.rooms = vocabularies["Rooms"]
+        self.types = vocabularies["Type"]
+        self.condition = vocabularies["Condition"]
+        self.heating = vocabularies["Heating"]
+        self.area_range = metadata["ranges"]["Area_m2"]
+        self.floor_lists = metadata["floor_options"]
+        self._floor_total = None
 
     def _build_ui(self):
         layout = QtWidgets.QVBoxLayout(self)
@@ -57,7 +80,10 @@ class ApartmentApp(QtWidgets.QWidget):
         # Size
         self.size_le = QtWidgets.QLineEdit()
         self.size_le.setStyleSheet("color: black;")
-        self.size_le.setPlaceholderText("e.g. 65")
+        placeholder = "e.g. 65"
+        if self.area_range:
+            placeholder += f" (listings: {self.area_range[0]:.0f}–{self.area_range[1]:.0f})"
+        self.size_le.setPlaceholderText(placeholder)
         form.addRow("Area (m²):", self.size_le)
 
         # Rooms
@@ -108,14 +134,40 @@ class ApartmentApp(QtWidgets.QWidget):
         park_layout.addWidget(self.parking_cb)
         layout.addLayout(park_layout)
 
+        # live estimate, refreshed as the fields change
+        self.estimate_lbl = QtWidgets.QLabel("–")
+        self.estimate_lbl.setFont(QtGui.QFont("Arial", 13, QtGui.QFont.Weight.Bold))
+        self.estimate_lbl.setAlignment(QtCore.Qt.AlignmentFlag.AlignCenter)
+        self.estimate_lbl.setStyleSheet("color: #1b63d6;")
+        layout.addWidget(self.estimate_lbl)
+
         btn_layout = QtWidgets.QHBoxLayout()
         self.poly_btn = QtWidgets.QPushButton("Calculate Price")
         self.poly_btn.setCursor(Qt.CursorShape.PointingHandCursor)
+        self.poly_btn.setEnabled(False)
         btn_layout.addWidget(self.poly_btn)
         layout.addLayout(btn_layout)
 
+        # model status: loading / ready / busy
+        self.status_lbl = QtWidgets.QLabel()
+        self.status_lbl.setAlignment(QtCore.Qt.AlignmentFlag.AlignCenter)
+        layout.addWidget(self.status_lbl)
+
         self.poly_btn.clicked.connect(self.submit_polynomial_regression)
 
+        # debounce: every edit restarts the timer, the estimate runs once typing pauses
+        self.estimate_timer = QtCore.QTimer(self)
+        self.estimate_timer.setSingleShot(True)
+        self.estimate_timer.setInterval(DEBOUNCE_MS)
+        self.estimate_timer.timeout.connect(self.update_estimate)
+        for line_edit in (self.size_le, self.floor_total_le):
+            line_edit.textChanged.connect(self._restart_estimate)
+        for combo in (self.municipality_cb, self.rooms_cb, self.type_cb, self.condition_cb, self.heating_cb,
+                      self.floor_cb):
+            combo.currentIndexChanged.connect(self._restart_estimate)
+        for check in (self.garage_cb, self.parking_cb):
+            check.toggled.connect(self._restart_estimate)
+
         # Initialize floors
         self.update_floors()
 
@@ -218,17 +270,19 @@ class ApartmentApp(QtWidgets.QWidget):
         except ValueError:
             total = 0
 
-        options = [f"PR/{total}", f"VPR/{total}"]
-        for roman, value in ROMAN_MAP.items():
-            if value <= total:
-                options.append(f"{roman}/{total}")
+        # keystrokes that don't change the total keep the list and the selection
+        if total == self._floor_total:
+            return
+        self._floor_total = total
+        options = self.floor_lists.get(str(total)) or floor_options(total)
 
         self.floor_cb.clear()
         if options:
             self.floor_cb.addItems(options)
             self.floor_cb.setCurrentIndex(0)
 
-    def validate_inputs(self):
+    def _input_error(self):
+        # first problem with the form, or None when it can be priced
         required = {
             "Municipality": self.municipality_cb.currentText(),
             "Area": self.size_le.text(),
@@ -241,27 +295,29 @@ class ApartmentApp(QtWidgets.QWidget):
         }
         for name, val in required.items():
             if not val or not str(val).strip():
-                QtWidgets.QMessageBox.critical(self, "Error", f"Field '{name}' cannot be empty!")
-                return False
+                return f"Field '{name}' cannot be empty!"
 
         try:
             size = float(self.size_le.text())
             if size < 0:
-                QtWidgets.QMessageBox.critical(self, "Error", "Area cannot be negative!")
-                return False
+                return "Area cannot be negative!"
         except ValueError:
-            QtWidgets.QMessageBox.critical(self, "Error", "Area must be a number!")
-            return False
+            return "Area must be a number!"
 
         try:
             total_floors = int(self.floor_total_le.text())
             if total_floors < 0:
-                QtWidgets.QMessageBox.critical(self, "Error", "Total floors cannot be negative!")
-                return False
+                return "Total floors cannot be negative!"
         except ValueError:
-            QtWidgets.QMessageBox.critical(self, "Error", "Total floors must be an integer!")
-            return False
+            return "Total floors must be an integer!"
+
+        return None
 
+    def validate_inputs(self):
+        error = self._input_error()
+        if error:
+            QtWidgets.QMessageBox.critical(self, "Error", error)
+            return False
         return True
 
     def _collect_apartment(self):
@@ -285,7 +341,7 @@ class ApartmentApp(QtWidgets.QWidget):
     def _show_prediction_popup(self, title, prediction, color="green"):
         dlg = QtWidgets.QDialog(self)
         dlg.setWindowTitle(title)
-        dlg.setFixedSize(420, 200)
+        dlg.setFixedSize(460, 260)
 
         v = QtWidgets.QVBoxLayout(dlg)
         lbl_title = QtWidgets.QLabel("Estimated Apartment Value")
@@ -296,6 +352,7 @@ class ApartmentApp(QtWidgets.QWidget):
         lbl_price = QtWidgets.QLabel(f"{prediction} €")
         lbl_price.setFont(QtGui.QFont("Arial", 16, QtGui.QFont.Weight.Bold))
         lbl_price.setAlignment(QtCore.Qt.AlignmentFlag.AlignCenter)
+        lbl_price.setWordWrap(True)
         lbl_price.setStyleSheet(f"color: {color};")
         v.addWidget(lbl_price)
 
@@ -310,12 +367,92 @@ class ApartmentApp(QtWidgets.QWidget):
 
         dlg.exec()
 
+    def _set_status(self, text, color):
+        self.status_lbl.setText(text)
+        self.status_lbl.setStyleSheet(f"color: {color};")
+
+    def _run_job(self, fn, *args, on_result):
+        # run on the pool; results come back on the UI thread through the job's signals
+        job = None
+
+        def finished():
+            self._jobs.discard(job)
+
+        job = submit(self.pool, fn, *args, on_result=on_result, on_error=self._on_job_error,
+                     on_finished=finished)
+        self._jobs.add(job)
+
+    def _load_model(self):
+        from models.polynomial_regression import PolynomialRegressionModel
+        from models.registry import INTERVAL_MODEL_PARAMS, ModelRegistry
+
+        if self.registry is None:
+            self.registry = ModelRegistry()
+        # Loaded from disk once (the pipeline trains it), retrained only when the data changes
+        return self.registry.get(PolynomialRegressionModel, CLEAN_CSV, **INTERVAL_MODEL_PARAMS)
+
+    def _start_model_load(self):
+        self._set_status("Loading model…", "#b36b00")
+        self._run_job(self._load_model, on_result=self._on_model_ready)
+
+    def _set_ready(self):
+        self._set_status("● Model ready", "#1b8a3a")
+        self.poly_btn.setEnabled(True)
+
+    def _on_model_ready(self, model):
+        self.model = model
+        # one cache per model: keys are normalized inputs, values price per m²
+        self._estimate = lru_cache(maxsize=ESTIMATE_CACHE_SIZE)(self._estimate_uncached)
+        self._set_ready()
+        self.update_estimate()
+
+    def _estimate_key(self):
+        # normalized feature tuple, so equivalent inputs ("65", "65.0") share a cache entry
+        apartment = self._collect_apartment()
+        apartment["Area_m2"] = round(apartment["Area_m2"], 1)
+        return tuple(apartment.items())
+
+    def _estimate_uncached(self, key):
+        # only cache misses reach the model, so the trace counts those
+        with span("gui.estimate"):
+            return self.model.predict_row(dict(key))
+
+    def _restart_estimate(self, *_):
+        # the signal argument is dropped: start(value) would replace the debounce interval with it
+        self.estimate_timer.start()
+
+    def update_estimate(self):
+        if self.model is None or self._input_error():
+            self.estimate_lbl.setText("–")
+            return
+        key = self._estimate_key()
+        price_per_m2 = self._estimate(key)
+        area = dict(key)["Area_m2"]
+        self.estimate_lbl.setText(f"≈ {price_per_m2 * area:,.0f} € ({price_per_m2:,.0f} €/m²)")
+
+    def _on_job_error(self, message):
+        if self.model is None:
+            self._set_status("Model unavailable", "#c0392b")
+        else:
+            self._set_ready()
+        QtWidgets.QMessageBox.critical(self, "Error", message)
+
     def submit_polynomial_regression(self):
-        if not self.validate_inputs():
+        if self.model is None or not self.validate_inputs():
             return
         new_apartment = self._collect_apartment()
-        model = PolynomialRegressionModel()
-        prediction = model.predict(new_apartment)
+        # disabled only while this prediction is pending
+        self.poly_btn.setEnabled(False)
+        self._set_status("Estimating…", "#b36b00")
+        self._run_job(self._predict, new_apartment, on_result=self._on_prediction)
+
+    def _predict(self, apartment):
+        # runs on the pool
+        with span("gui.predict"):
+            return self.model.predict(apartment, INTERVAL)
+
+    def _on_prediction(self, prediction):
+        self._set_ready()
         self._show_prediction_popup("Predicted Price", prediction, color="#1b63d6")
 
 
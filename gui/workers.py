@@ -0,0 +1,42 @@
+from PySide6 import QtCore
+
+
+class JobSignals(QtCore.QObject):
+    # emitted from the pool thread; Qt queues them to the receivers on the UI thread
+    result = QtCore.Signal(object)
+    error = QtCore.Signal(str)
+    finished = QtCore.Signal()
+
+
+class Job(QtCore.QRunnable):
+    # run fn(*args) on a QThreadPool thread and report back through signals
+    def __init__(self, fn, *args):
+        super().__init__()
+        self.fn = fn
+        self.args = args
+        self.signals = JobSignals()
+        # the caller's reference owns the job, so its signals outlive run()
+        self.setAutoDelete(False)
+
+    def run(self):
+        try:
+            value = self.fn(*self.args)
+        except Exception as exc:
+            self.signals.error.emit(f"{type(exc).__name__}: {exc}")
+        else:
+            self.signals.result.emit(value)
+        finally:
+            self.signals.finished.emit()
+
+
+def submit(pool, fn, *args, on_result=None, on_error=None, on_finished=None):
+    # wire the callbacks, then queue the job; returns it so callers can keep a reference
+    job = Job(fn, *args)
+    if on_result is not None:
+        job.signals.result.connect(on_result)
+    if on_error is not None:
+        job.signals.error.connect(on_error)
+    if on_finished is not None:
+        job.signals.finished.connect(on_finished)
+    pool.start(job)
+    return job
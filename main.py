@@ -1,16 +1,205 @@
-# This is a sample Python script.
+import argparse
 
-# Press Shift+F10 to execute it or replace it with your code.
-# Press Double Shift to search everywhere for classes, files, tool windows, actions, and settings.
+from scripts.paths import CLEAN_CSV, ENCODED_CSV
 
 
-def print_hi(name):
-    # Use a breakpoint in the code line below to debug your script.
-    print(f'Hi, {name}')  # Press Ctrl+F8 to toggle the breakpoint.
+def build_model(args):
+    # heavy imports stay inside the commands so `--help` is instant
+    # non-default options only, so default artifacts keep their fingerprint
+    options = {"chunksize": args.train_chunksize} if args.train_chunksize else {}
+    if args.municipality_encoding != "rank":
+        options["municipality_encoding"] = args.municipality_encoding
+    if args.bootstrap is None:
+        # bare --bootstrap: the GUI's refit count, so the artifact is the one the GUI loads
+        from models.bootstrap import N_BOOTSTRAP
+        args.bootstrap = N_BOOTSTRAP
+    if args.bootstrap:
+        options["n_bootstrap"] = args.bootstrap
+    if args.model == "boosting":
+        if options:
+            raise SystemExit("the boosting model trains in memory on raw category codes, "
+                             "drop --train-chunksize/--municipality-encoding/--bootstrap")
+        from models.gradient_boosting import GradientBoostingModel
+        return GradientBoostingModel, {}
+    if args.model == "linear":
+        from models.linear_regression import LinearRegressionModel
+        return LinearRegressionModel, options
+    from models.polynomial_regression import PolynomialRegressionModel
+    return PolynomialRegressionModel, {"degree": args.degree, "ridge_alpha": args.alpha, **options}
 
 
-# Press the green button in the gutter to run the script.
-if __name__ == '__main__':
-    print_hi('PyCharm')
+def cmd_train(args):
+    from models.registry import ModelRegistry
 
-# See PyCharm help at https://www.jetbrains.com/help/pycharm/
+    model_cls, params = build_model(args)
+    registry = ModelRegistry()
+    registry.get(model_cls, args.csv, **params)
+    key = registry.fingerprint(model_cls, args.csv, **params)
+    print(f"Model artifact: {registry.artifact_path(model_cls, key)}")
+
+
+def cmd_evaluate(args):
+    if args.train_chunksize:
+        raise SystemExit("evaluate needs the in-memory train/test split, drop --train-chunksize")
+    model_cls, params = build_model(args)
+    model = model_cls(csv_path=args.csv, **params).train()
+    print(model.evaluate())
+
+
+def cmd_predict(args):
+    import pandas as pd
+    from models.registry import ModelRegistry
+    from preprocessing.storage import TableWriter, iter_table
+
+    model_cls, params = build_model(args)
+    if args.interval and not args.bootstrap:
+        raise SystemExit("--interval needs a model trained with --bootstrap")
+    model = ModelRegistry().get(model_cls, args.csv, **params)
+    # only the linear models take an interval
+    options = {"interval": args.interval} if args.interval else {}
+
+    # one chunk in memory at a time, whatever the input size
+    with TableWriter(args.output) as writer:
+        for chunk in iter_table(args.input, chunksize=args.chunksize, typed=False):
+            predictions = model.predict_batch(chunk, chunksize=args.chunksize, **options)
+            # predictions replace input columns of the same name, e.g. Price_per_m2 in the cleaned table
+            chunk = chunk.drop(columns=chunk.columns.intersection(predictions.columns))
+            writer.write(pd.concat([chunk, predictions], axis=1))
+    print(f"Wrote {writer.rows} predictions to {writer.path}")
+
+
+def cmd_serve(args):
+    from models.registry import ModelRegistry
+    from scripts.prediction_server import run
+
+    model_cls, params = build_model(args)
+    if args.interval and not args.bootstrap:
+        raise SystemExit("--interval needs a model trained with --bootstrap")
+    # loaded (or trained) once, before the first request
+    model = ModelRegistry().get(model_cls, args.csv, **params)
+    run(model, args.host, args.port, args.max_wait_ms, args.max_batch, args.interval)
+
+
+def cmd_pipeline(args):
+    from scripts.pipeline import Pipeline, build_stages
+
+    model_cls, params = build_model(args)
+    try:
+        stages = build_stages(model_cls, params, scrape=args.scrape)
+    except ValueError as exc:
+        raise SystemExit(str(exc))
+    timings = Pipeline(stages, workers=args.workers).run(force=args.force)
+    print(f"\n{'stage':<32}{'status':>10}{'seconds':>10}")
+    for name, status, seconds in timings:
+        print(f"{name:<32}{status:>10}{seconds:>10.2f}")
+
+
+def cmd_sweep(args):
+    import numpy as np
+    from models.ridge_sweep import DEFAULT_ALPHAS, sweep
+
+    alphas = np.array(args.alphas) if args.alphas else DEFAULT_ALPHAS
+    table = sweep(args.csv, args.degrees, alphas)
+    print(table.to_string(index=False, float_format=lambda v: f"{v:.4g}"))
+    best = table.loc[table["loo_rmse"].idxmin()]
+    print(f"\nLowest LOO RMSE: degree={int(best['degree'])}, alpha={best['alpha']:.4g} "
+          f"(test RMSE {best['test_rmse']:.2f} EUR/m², R² {best['test_r2']:.2f})")
+
+
+def cmd_cv(args):
+    from models.evaluation import MODELS, cross_validate
+    from models.streaming import TRAINING_COLUMNS
+    from preprocessing.storage import read_table
+
+    df = read_table(args.csv, columns=TRAINING_COLUMNS)
+    folds, summary = cross_validate(df, args.models or list(MODELS), args.folds, args.repeats, args.workers)
+    print(f"{args.repeats}x {args.folds}-fold CV on {len(df)} rows, 95% confidence intervals")
+    print(summary.to_string(index=False, float_format=lambda v: f"{v:.4g}"))
+
+
+def cmd_encode(args):
+    from preprocessing.numeric_encoding import encode_dataset
+
+    df_model, path = encode_dataset(args.input, args.output, args.format)
+    print(f"Encoded {len(df_model)} rows to {path}")
+
+
+def add_model_args(parser):
+    parser.add_argument("--model", choices=["polynomial", "linear", "boosting"], default="polynomial")
+    parser.add_argument("--csv", default=CLEAN_CSV, help="cleaned training data")
+    parser.add_argument("--degree", type=int, default=2)
+    parser.add_argument("--alpha", type=float, default=10.0, help="Ridge alpha")
+    parser.add_argument("--train-chunksize", type=int, default=None,
+                        help="train out of core on all rows, reading this many rows at a time")
+    parser.add_argument("--municipality-encoding", choices=["rank", "target"], default="rank",
+                        help="rank of mean price, or smoothed out-of-fold mean price")
+    parser.add_argument("--bootstrap", type=int, nargs="?", default=0, const=None,
+                        help="bootstrap refits kept for prediction intervals (linear/polynomial); "
+                             "without a value, as many as the GUI uses")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Belgrade apartment price models")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p = sub.add_parser("train", help="fit a model and store its artifact")
+    add_model_args(p)
+    p.set_defaults(func=cmd_train)
+
+    p = sub.add_parser("evaluate", help="fit a model and print test-set metrics")
+    add_model_args(p)
+    p.set_defaults(func=cmd_evaluate)
+
+    p = sub.add_parser("predict", help="score a CSV/Parquet/Feather file of listings")
+    add_model_args(p)
+    p.add_argument("--input", required=True)
+    p.add_argument("--output", required=True, help="format follows the extension")
+    p.add_argument("--chunksize", type=int, default=100_000)
+    p.add_argument("--interval", type=float, default=None,
+                   help="add lower/median/upper columns for this coverage, e.g. 0.9")
+    p.set_defaults(func=cmd_predict)
+
+    p = sub.add_parser("pipeline", help="clean, combine, encode and train, skipping stages whose inputs are unchanged")
+    add_model_args(p)
+    p.add_argument("--scrape", action="store_true", help="scrape listings and details first")
+    p.add_argument("--workers", type=int, default=None, help="stages run in parallel, default: CPU count")
+    p.add_argument("--force", action="store_true", help="re-run every stage")
+    p.set_defaults(func=cmd_pipeline)
+
+    p = sub.add_parser("serve", help="HTTP price service with micro-batching")
+    add_model_args(p)
+    p.add_argument("--host", default="127.0.0.1")
+    p.add_argument("--port", type=int, default=8080)
+    p.add_argument("--max-wait-ms", type=float, default=5.0,
+                   help="how long the first queued request waits for others to batch with")
+    p.add_argument("--max-batch", type=int, default=4096, help="rows per predict call")
+    p.add_argument("--interval", type=float, default=None,
+                   help="add lower/median/upper fields for this coverage, e.g. 0.9")
+    p.set_defaults(func=cmd_serve)
+
+    p = sub.add_parser("sweep", help="RMSE/R² and LOO/GCV over a grid of degree and Ridge alpha")
+    p.add_argument("--csv", default=CLEAN_CSV, help="cleaned training data")
+    p.add_argument("--degrees", type=int, nargs="+", default=[1, 2])
+    p.add_argument("--alphas", type=float, nargs="+", help="default: 21 values from 0.01 to 1000")
+    p.set_defaults(func=cmd_sweep)
+
+    p = sub.add_parser("cv", help="repeated k-fold comparison of models: accuracy, fit time, latency, memory")
+    p.add_argument("--csv", default=CLEAN_CSV, help="cleaned training data")
+    p.add_argument("--models", nargs="+", help="default: all registered models")
+    p.add_argument("--folds", type=int, default=5)
+    p.add_argument("--repeats", type=int, default=3)
+    p.add_argument("--workers", type=int, default=None, help="processes, default: CPU count")
+    p.set_defaults(func=cmd_cv)
+
+    p = sub.add_parser("encode", help="write the scaled numeric feature table")
+    p.add_argument("--input", default=CLEAN_CSV)
+    p.add_argument("--output", default=ENCODED_CSV)
+    p.add_argument("--format", choices=["parquet", "feather", "csv"], default="parquet")
+    p.set_defaults(func=cmd_encode)
+
+    args = parser.parse_args(argv)
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from models.streaming import GramAccumulator
+
+# refits behind the interval model the GUI serves (see models.registry.INTERVAL_MODEL_PARAMS)
+N_BOOTSTRAP = 200
+
+
+class BootstrapEnsemble:
+    # Bootstrap refits of a (Ridge) linear model on a fixed design matrix, stacked into one
+    # coefficient matrix so a whole batch is predicted by every member with a single matmul.
+    # Each member also carries one residual drawn from its out-of-bag rows, so the spread covers
+    # the noise around the fit and not only the uncertainty of the coefficients.
+    def __init__(self, n_models=200, alpha=0.0, random_state=42):
+        self.n_models = n_models
+        self.alpha = alpha
+        self.random_state = random_state
+        self.coefs = None
+        self.intercepts = None
+        self.residuals = None
+
+    def _fit_member(self, X, y, seed):
+        rng = np.random.default_rng(seed)
+        counts = np.bincount(rng.integers(0, len(y), len(y)), minlength=len(y)).astype(np.float64)
+        coef, intercept = GramAccumulator().update(X, y, weights=counts).solve(self.alpha)
+
+        out_of_bag = counts == 0
+        if not out_of_bag.any():
+            out_of_bag[:] = True
+        residual = y[out_of_bag] - (X[out_of_bag] @ coef + intercept)
+        return coef, intercept, rng.choice(residual)
+
+    def fit(self, X, y, workers=None):
+        # members are independent; numpy releases the GIL inside the matrix products
+        y = np.asarray(y, dtype=np.float64)
+        seeds = np.random.SeedSequence(self.random_state).spawn(self.n_models)
+        with ThreadPoolExecutor(max_workers=workers or os.cpu_count()) as pool:
+            members = list(pool.map(lambda seed: self._fit_member(X, y, seed), seeds))
+
+        self.coefs = np.column_stack([coef for coef, _, _ in members])
+        self.intercepts = np.array([intercept for _, intercept, _ in members])
+        self.residuals = np.array([residual for _, _, residual in members])
+        return self
+
+    def quantiles(self, X, q) -> np.ndarray:
+        # (rows, len(q)) predictive quantiles from one (rows x features) @ (features x members) product
+        samples = X @ self.coefs
+        samples += self.intercepts + self.residuals
+        return np.quantile(samples, q, axis=1).T
+
+    def coverage(self, X, y, level=0.9):
+        # share of rows whose true value falls inside the interval, should be close to `level`
+        lower, _, upper = self.quantiles(X, interval_quantiles(level)).T
+        y = np.asarray(y, dtype=np.float64)
+        return float(np.mean((y >= lower) & (y <= upper)))
+
+
+def interval_quantiles(level):
+    # e.g. 0.9 -> the 5th, 50th and 95th percentiles
+    return [(1 - level) / 2, 0.5, (1 + level) / 2]
+
+
+def interval_columns(bounds, area, index) -> pd.DataFrame:
+    # lower/median/upper price per m² and total price from (rows, 3) price-per-m² bounds
+    columns = {}
+    for unit, scale in (("Price_per_m2", 1.0), ("Total_price", area)):
+        for i, name in enumerate(["lower", "median", "upper"]):
+            columns[f"{unit}_{name}"] = bounds[:, i] * scale
+    return pd.DataFrame(columns, index=index)
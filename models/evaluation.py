@@ -0,0 +1,108 @@
+import os
+import time
+import tracemalloc
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+from scipy import stats
+from sklearn.model_selection import RepeatedKFold
+
+from models.gradient_boosting import GradientBoostingModel
+from models.linear_regression import LinearRegressionModel
+from models.polynomial_regression import PolynomialRegressionModel
+
+# name -> (model class, constructor params); every class provides fit(df) and predict_batch(df)
+MODELS = {
+    "linear": (LinearRegressionModel, {}),
+    "polynomial": (PolynomialRegressionModel, {"degree": 2, "ridge_alpha": 10.0}),
+    # one OpenMP thread per fold, the process pool already keeps every core busy
+    "boosting": (GradientBoostingModel, {"n_threads": 1}),
+}
+
+# set once per worker process so the frame isn't pickled with every fold
+_frame = None
+
+
+def _init_worker(df):
+    global _frame
+    _frame = df
+
+
+def _run_fold(job):
+    name, model_cls, params, repeat, fold, train_idx, test_idx = job
+    df_train = _frame.iloc[train_idx]
+    df_test = _frame.iloc[test_idx]
+
+    # preprocessing is fitted inside the fold, so municipality scores never see the test rows
+    tracemalloc.start()
+    t0 = time.perf_counter()
+    model = model_cls(**params).fit(df_train)
+    fit_seconds = time.perf_counter() - t0
+    _, fit_peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    t0 = time.perf_counter()
+    pred = model.predict_batch(df_test)["Price_per_m2"].to_numpy()
+    batch_seconds = time.perf_counter() - t0
+
+    single = df_test.iloc[:1]
+    timings = []
+    for _ in range(20):
+        t0 = time.perf_counter()
+        model.predict_batch(single)
+        timings.append(time.perf_counter() - t0)
+
+    y = df_test["Price_per_m2"].to_numpy(dtype=np.float64)
+    resid = y - pred
+    return {
+        "model": name,
+        "repeat": repeat,
+        "fold": fold,
+        "rmse": float(np.sqrt(np.mean(resid ** 2))),
+        "r2": float(1 - np.sum(resid ** 2) / np.sum((y - y.mean()) ** 2)),
+        "fit_s": fit_seconds,
+        "fit_peak_mb": fit_peak / 1e6,
+        "predict_us_per_row": batch_seconds / len(df_test) * 1e6,
+        "single_predict_ms": float(np.median(timings)) * 1e3,
+    }
+
+
+def _confidence_interval(values, level=0.95):
+    # t interval on the fold scores; folds share training rows, so read it as approximate
+    values = np.asarray(values)
+    half = stats.t.ppf((1 + level) / 2, len(values) - 1) * values.std(ddof=1) / np.sqrt(len(values))
+    return values.mean() - half, values.mean() + half
+
+
+def cross_validate(df: pd.DataFrame, models=None, n_splits=5, n_repeats=3, workers=None, seed=42):
+    # repeated k-fold over a process pool; returns (per-fold results, per-model summary)
+    models = models or list(MODELS)
+    df = df.dropna(subset=["Price_per_m2"]).reset_index(drop=True)
+    splitter = RepeatedKFold(n_splits=n_splits, n_repeats=n_repeats, random_state=seed)
+    jobs = [
+        (name, *MODELS[name], i // n_splits, i % n_splits, train_idx, test_idx)
+        for i, (train_idx, test_idx) in enumerate(splitter.split(df))
+        for name in models
+    ]
+
+    workers = workers or os.cpu_count()
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(df,)) as pool:
+        folds = pd.DataFrame(list(pool.map(_run_fold, jobs)))
+
+    rows = []
+    for name, group in folds.groupby("model", sort=False):
+        rmse_low, rmse_high = _confidence_interval(group["rmse"])
+        r2_low, r2_high = _confidence_interval(group["r2"])
+        rows.append({
+            "model": name,
+            "rmse": group["rmse"].mean(),
+            "rmse_ci": f"[{rmse_low:.1f}, {rmse_high:.1f}]",
+            "r2": group["r2"].mean(),
+            "r2_ci": f"[{r2_low:.3f}, {r2_high:.3f}]",
+            "fit_s": group["fit_s"].median(),
+            "fit_peak_mb": group["fit_peak_mb"].max(),
+            "predict_us_per_row": group["predict_us_per_row"].median(),
+            "single_predict_ms": group["single_predict_ms"].median(),
+        })
+    return folds, pd.DataFrame(rows)
@@ -4,24 +4,63 @@ from sklearn.model_selection import train_test_split
 from sklearn.metrics import mean_squared_error, r2_score
 import numpy as np
 from preprocessing.numeric_encoding import ApartmentPreprocessor
+from preprocessing.storage import read_table
+from scripts.paths import CLEAN_CSV
+from models.bootstrap import BootstrapEnsemble, interval_columns, interval_quantiles
+from models.streaming import accumulate_gram, fit_preprocessor
+from scripts.instrumentation import span, traced
 
 
 class LinearRegressionModel:
-    def __init__(self, csv_path="../data/processed/serbian_apartments_clean.csv"):
+    def __init__(self, csv_path=CLEAN_CSV, chunksize=None,
+                 municipality_encoding="rank", n_bootstrap=0):
+        # Nothing is loaded or fitted until train() is called
+        self.csv_path = csv_path
+        # With a chunksize, train() streams the file instead of loading it
+        self.chunksize = chunksize
+        # "rank" or "target", see ApartmentPreprocessor
+        self.municipality_encoding = municipality_encoding
+        # bootstrap refits behind predict_batch(interval=...), 0 disables intervals
+        self.n_bootstrap = n_bootstrap
+        self.prep = None
+        self.model = None
+        self.feature_columns = None
+        self.intervals = None
+        self.X_train = None
+        self.X_test = None
+
+    @classmethod
+    def from_artifact(cls, artifact: dict):
+        # Rebuild a ready-to-predict model from a saved artifact without retraining
+        model = cls()
+        model.prep = artifact["prep"]
+        model.model = artifact["model"]
+        model.feature_columns = artifact["feature_columns"]
+        model.intervals = artifact["intervals"]
+        return model
+
+    def to_artifact(self):
+        return {
+            "prep": self.prep,
+            "model": self.model,
+            "feature_columns": self.feature_columns,
+            "intervals": self.intervals,
+        }
+
+    @traced()
+    def load_data(self):
         # Load the dataset
-        self.df_clean = pd.read_csv(csv_path, encoding="utf-8-sig", on_bad_lines="skip")
+        self.df_clean = read_table(self.csv_path, columns=ApartmentPreprocessor.INPUT_COLUMNS + ["Price_per_m2"])
+        # Prepare target (y) before preprocessing, the preprocessor only keeps feature columns
+        self.y = self.df_clean["Price_per_m2"]
         # Create and fit the preprocessor
-        self.prep = ApartmentPreprocessor()
-        df_model = self.prep.fit_transform(self.df_clean, scale=True)
-        # Prepare features (X) and target (y)
-        self.X = df_model.drop(columns=["Price_per_m2"])
-        self.y = df_model["Price_per_m2"]
-        # Initialize Linear Regression model
-        self.model = LinearRegression()
+        X_raw = self.df_clean.drop(columns=["Price_per_m2"])
+        self.prep = ApartmentPreprocessor(municipality_encoding=self.municipality_encoding)
+        self.X = self.prep.fit_transform_array(X_raw, scale=True)
+        self.feature_columns = self.prep.feature_names_
         # Split dataset into train and test sets
         self._split_data()
-        # Train the model
-        self.train()
+        return self
 
     def _split_data(self):
         # Perform train-test split (80% train, 20% test)
@@ -29,11 +68,58 @@ class LinearRegressionModel:
             self.X, self.y, test_size=0.2, random_state=42
         )
 
+    @traced()
     def train(self):
+        if self.chunksize:
+            return self.train_streaming()
+        if self.X_train is None:
+            self.load_data()
         # Fit the Linear Regression model on training data
-        self.model.fit(self.X_train, self.y_train)
+        self.model = LinearRegression()
+        with span("LinearRegression.fit", rows=len(self.X_train)):
+            self.model.fit(self.X_train, self.y_train)
+        self._fit_intervals(self.X_train, self.y_train)
+        return self
+
+    def fit(self, df: pd.DataFrame):
+        # Fit preprocessor and estimator on a cleaned frame, e.g. one cross-validation fold
+        self.prep = ApartmentPreprocessor(municipality_encoding=self.municipality_encoding)
+        X = self.prep.fit_transform_array(df, scale=True)
+        self.feature_columns = self.prep.feature_names_
+        y = df["Price_per_m2"].to_numpy(dtype=np.float64)
+        with span("LinearRegression.fit", rows=len(X)):
+            self.model = LinearRegression().fit(X, y)
+        self._fit_intervals(X, y)
+        return self
+
+    def _fit_intervals(self, X, y):
+        if self.n_bootstrap:
+            with span("BootstrapEnsemble.fit", members=self.n_bootstrap):
+                self.intervals = BootstrapEnsemble(self.n_bootstrap, alpha=0.0).fit(X, y)
+
+    @traced()
+    def train_streaming(self):
+        # Fit on every row in bounded memory from XᵀX and Xᵀy accumulated chunk by chunk
+        if self.n_bootstrap:
+            raise ValueError("bootstrap intervals need the training rows in memory, train without chunksize")
+        if self.municipality_encoding == "target":
+            raise ValueError("out-of-fold target encoding needs the training rows in memory, train without chunksize")
+        self.prep = fit_preprocessor(self.csv_path, self.chunksize, self.municipality_encoding)
+        self.feature_columns = self.prep.feature_names_
+        gram = accumulate_gram(self.csv_path, self.chunksize, self.prep)
+
+        self.model = LinearRegression()
+        self.model.coef_, self.model.intercept_ = gram.solve(alpha=0.0)
+        self.model.n_features_in_ = len(self.model.coef_)
+        return self
 
     def evaluate(self):
+        # Scores the held-out 20%, split off the CSV again for a model loaded from an artifact
+        if self.X_test is None:
+            if self.chunksize:
+                raise ValueError("a model trained with chunksize has no held-out split, "
+                                 "evaluate a model trained without chunksize")
+            self.load_data()
         # Predict on test set
         y_pred = self.model.predict(self.X_test)
         # Calculate Mean Squared Error
@@ -43,27 +129,52 @@ class LinearRegressionModel:
         # Calculate R² score
         r2 = r2_score(self.y_test, y_pred)
         # Return evaluation metrics
-        return f"Root Mean Squared Error: {rmse:.2f} EUR/m²\nR² Score: {r2:.2f}"
-
-    def predict(self, new_apartment: dict):
-        # Convert the dict to a DataFrame
-        df_new = pd.DataFrame([new_apartment])
-
-        # Preprocess the new apartment using already fitted preprocessor
-        df_new_processed = self.prep.transform(df_new, scale=True).drop(columns=["Price_per_m2"])
-
-        # Reindex to ensure same features as training set
-        df_new_processed = df_new_processed.reindex(columns=self.X.columns, fill_value=0)
+        report = f"Root Mean Squared Error: {rmse:.2f} EUR/m²\nR² Score: {r2:.2f}"
+        if self.intervals is not None:
+            report += f"\n90% interval coverage: {self.intervals.coverage(self.X_test, self.y_test):.1%}"
+        return report
 
-        # Predict price per m²
-        price_per_m2 = self.model.predict(df_new_processed)[0]
+    @traced()
+    def predict_batch(self, df: pd.DataFrame, chunksize=100_000, interval=None) -> pd.DataFrame:
+        # Price per m² and total price for every row, preprocessed and predicted chunk by chunk.
+        # With interval=0.9, also the 5%/50%/95% bootstrap quantiles of both.
+        if interval and self.intervals is None:
+            raise ValueError("model was trained without n_bootstrap, no intervals available")
+        price_per_m2 = np.empty(len(df))
+        bounds = np.empty((len(df), 3)) if interval else None
+        q = interval_quantiles(interval) if interval else None
+        for start in range(0, len(df), chunksize):
+            chunk = df.iloc[start:start + chunksize]
+            X = self.prep.transform_array(chunk, scale=True)
+            with span("LinearRegression.predict", rows=len(X)):
+                price_per_m2[start:start + len(chunk)] = self.model.predict(X)
+            if interval:
+                with span("BootstrapEnsemble.quantiles", rows=len(X)):
+                    bounds[start:start + len(chunk)] = self.intervals.quantiles(X, q)
 
-        # Calculate total price
-        area = float(new_apartment["Area_m2"])
-        total_price = price_per_m2 * area
+        area = self.prep.parse_area(df["Area_m2"])
+        result = pd.DataFrame({"Price_per_m2": price_per_m2, "Total_price": price_per_m2 * area}, index=df.index)
+        if interval:
+            result = pd.concat([result, interval_columns(bounds, area, df.index)], axis=1)
+        return result
 
-        return f"Price per m²: {price_per_m2:.2f} EUR/m²\nTotal price: {total_price:.2f} EUR"
+    @traced()
+    def predict_row(self, apartment: dict) -> float:
+        # price per m² for one apartment without pandas, for interactive use
+        x = self.prep.transform_row(apartment)
+        return float(self.model.coef_ @ x + self.model.intercept_)
 
+    def predict(self, new_apartment: dict, interval=None):
+        # Single apartment as a formatted string, via the batch path
+        prediction = self.predict_batch(pd.DataFrame([new_apartment]), interval=interval).iloc[0]
+        price_per_m2 = prediction["Price_per_m2"]
+        total_price = prediction["Total_price"]
 
-model = LinearRegressionModel()
-print(model.evaluate())
+        text = f"Price per m²: {price_per_m2:.2f} EUR/m²\nTotal price: {total_price:.2f} EUR"
+        if interval:
+            text += (
+                f"\n{interval:.0%} range: {prediction['Price_per_m2_lower']:.0f} – "
+                f"{prediction['Price_per_m2_upper']:.0f} EUR/m², "
+                f"{prediction['Total_price_lower']:.0f} – {prediction['Total_price_upper']:.0f} EUR"
+            )
+        return text
@@ -6,77 +6,216 @@ from sklearn.pipeline import Pipeline
 from sklearn.linear_model import Ridge
 from sklearn.metrics import mean_squared_error, r2_score
 from preprocessing.numeric_encoding import ApartmentPreprocessor
+from preprocessing.storage import read_table
+from scripts.paths import CLEAN_CSV
+from models.bootstrap import BootstrapEnsemble, interval_columns, interval_quantiles
+from models.streaming import accumulate_gram, fit_preprocessor
+from scripts.instrumentation import span, traced
 
 
 class PolynomialRegressionModel:
-    def __init__(self, csv_path="../data/processed/serbian_apartments_clean.csv", degree=2, ridge_alpha=10.0):
+    def __init__(self, csv_path=CLEAN_CSV, degree=2, ridge_alpha=10.0,
+                 chunksize=None, municipality_encoding="rank", n_bootstrap=0):
+        # Nothing is loaded or fitted until train() is called
+        self.csv_path = csv_path
+        # With a chunksize, train() streams the file instead of loading it
+        self.chunksize = chunksize
+        # "rank" or "target", see ApartmentPreprocessor
+        self.municipality_encoding = municipality_encoding
+        # bootstrap refits behind predict_batch(interval=...), 0 disables intervals
+        self.n_bootstrap = n_bootstrap
+
+        # Polynomial degree and Ridge alpha
+        self.degree = degree
+        self.ridge_alpha = ridge_alpha
+
+        self.prep = None
+        self.pipeline = None
+        self.feature_columns = None
+        self.intervals = None
+        self.X_train = None
+        self.X_test = None
+
+    @classmethod
+    def from_artifact(cls, artifact: dict):
+        # Rebuild a ready-to-predict model from a saved artifact without retraining
+        model = cls(degree=artifact["degree"], ridge_alpha=artifact["ridge_alpha"])
+        model.prep = artifact["prep"]
+        model.pipeline = artifact["pipeline"]
+        model.feature_columns = artifact["feature_columns"]
+        model.intervals = artifact["intervals"]
+        return model
+
+    def to_artifact(self):
+        # Everything predict() needs: fitted preprocessor, pipeline and column layout
+        return {
+            "prep": self.prep,
+            "pipeline": self.pipeline,
+            "feature_columns": self.feature_columns,
+            "intervals": self.intervals,
+            "degree": self.degree,
+            "ridge_alpha": self.ridge_alpha,
+        }
+
+    @traced()
+    def load_data(self):
         # Load original dataset
-        self.df_clean = pd.read_csv(csv_path, encoding="utf-8-sig", on_bad_lines="skip")
+        self.df_clean = read_table(self.csv_path, columns=ApartmentPreprocessor.INPUT_COLUMNS + ["Price_per_m2"])
 
         # Separate target variable BEFORE preprocessing
         self.y = self.df_clean["Price_per_m2"]
         X_raw = self.df_clean.drop(columns=["Price_per_m2"])
 
         # Create and fit the preprocessor
-        self.prep = ApartmentPreprocessor()
-        self.X = self.prep.fit_transform(X_raw, scale=True)
+        self.prep = ApartmentPreprocessor(municipality_encoding=self.municipality_encoding)
+        self.X = self.prep.fit_transform_array(X_raw, scale=True)
 
-        # Polynomial degree and Ridge alpha
-        self.degree = degree
-        self.ridge_alpha = ridge_alpha
-
-        # Initialize the pipeline
-        self.pipeline = Pipeline([
-            ("poly", PolynomialFeatures(degree=self.degree, include_bias=False, interaction_only=True)),
-            ("ridge", Ridge(alpha=self.ridge_alpha, random_state=42))
-        ])
+        # Column layout the pipeline is fitted on, fixed by the preprocessor
+        self.feature_columns = self.prep.feature_names_
 
         # Split the data
         self._split_data()
-
-        # Train the model
-        self.train()
+        return self
 
     def _split_data(self):
         self.X_train, self.X_test, self.y_train, self.y_test = train_test_split(
             self.X, self.y, test_size=0.2, random_state=42
         )
 
+    def _new_pipeline(self):
+        return Pipeline([
+            ("poly", PolynomialFeatures(degree=self.degree, include_bias=False, interaction_only=True)),
+            ("ridge", Ridge(alpha=self.ridge_alpha, random_state=42))
+        ])
+
+    @traced()
     def train(self):
-        self.pipeline.fit(self.X_train, self.y_train)
+        if self.chunksize:
+            return self.train_streaming()
+        if self.X_train is None:
+            self.load_data()
+
+        design = self._fit_pipeline(self.X_train, self.y_train)
+        self._fit_intervals(design, self.y_train)
+        return self
+
+    def fit(self, df: pd.DataFrame):
+        # Fit preprocessor and estimator on a cleaned frame, e.g. one cross-validation fold
+        self.prep = ApartmentPreprocessor(municipality_encoding=self.municipality_encoding)
+        X = self.prep.fit_transform_array(df, scale=True)
+        self.feature_columns = self.prep.feature_names_
+        y = df["Price_per_m2"].to_numpy(dtype=np.float64)
+        design = self._fit_pipeline(X, y)
+        self._fit_intervals(design, y)
+        return self
+
+    def _fit_pipeline(self, X, y):
+        # what Pipeline.fit does, step by step so expansion and solve are timed separately;
+        # returns the expanded matrix for the bootstrap refits
+        self.pipeline = self._new_pipeline()
+        with span("PolynomialFeatures.fit_transform", rows=len(X)):
+            design = self.pipeline.named_steps["poly"].fit_transform(X)
+        with span("Ridge.fit", rows=len(design), features=design.shape[1]):
+            self.pipeline.named_steps["ridge"].fit(design, y)
+        return design
+
+    def _design(self, X):
+        # matrix the Ridge step sees, i.e. after the polynomial expansion
+        with span("PolynomialFeatures.transform", rows=len(X)):
+            return self.pipeline.named_steps["poly"].transform(X)
+
+    def _fit_intervals(self, design, y):
+        if self.n_bootstrap:
+            with span("BootstrapEnsemble.fit", members=self.n_bootstrap):
+                self.intervals = BootstrapEnsemble(self.n_bootstrap, self.ridge_alpha).fit(design, y)
+
+    @traced()
+    def train_streaming(self):
+        # Fit on every row in bounded memory: preprocessor statistics, then XᵀX and Xᵀy chunk by chunk.
+        # Gives the coefficients an in-memory Ridge fit on the same rows would.
+        if self.n_bootstrap:
+            raise ValueError("bootstrap intervals need the training rows in memory, train without chunksize")
+        if self.municipality_encoding == "target":
+            raise ValueError("out-of-fold target encoding needs the training rows in memory, train without chunksize")
+        self.prep = fit_preprocessor(self.csv_path, self.chunksize, self.municipality_encoding)
+        self.feature_columns = self.prep.feature_names_
+
+        self.pipeline = self._new_pipeline()
+        poly = self.pipeline.named_steps["poly"].fit(np.zeros((1, len(self.feature_columns))))
+        gram = accumulate_gram(self.csv_path, self.chunksize, self.prep, expand=poly.transform)
+
+        ridge = self.pipeline.named_steps["ridge"]
+        ridge.coef_, ridge.intercept_ = gram.solve(self.ridge_alpha)
+        ridge.n_features_in_ = len(ridge.coef_)
+        return self
 
     def evaluate(self):
+        # Scores the held-out 20%, split off the CSV again for a model loaded from an artifact
+        if self.X_test is None:
+            if self.chunksize:
+                raise ValueError("a model trained with chunksize has no held-out split, "
+                                 "evaluate a model trained without chunksize")
+            self.load_data()
         y_pred = self.pipeline.predict(self.X_test)
         mse = mean_squared_error(self.y_test, y_pred)
         rmse = np.sqrt(mse)
         r2 = r2_score(self.y_test, y_pred)
 
-        return (
+        report = (
             f"Polynomial Degree: {self.degree}\n"
             f"Ridge Alpha: {self.ridge_alpha}\n"
             f"Root Mean Squared Error (RMSE): {rmse:.2f} EUR/m²\n"
             f"R² Score: {r2:.2f}\n"
         )
-
-    def predict(self, new_apartment: dict):
-        # Convert dict to DataFrame
-        df_new = pd.DataFrame([new_apartment])
-
-        # Preprocess using already fitted preprocessor
-        df_new_processed = self.prep.transform(df_new, scale=True)
-
-        # Reindex to ensure same features as training set
-        df_new_processed = df_new_processed.reindex(columns=self.X.columns, fill_value=0)
-
-        # Predict price per m²
-        price_per_m2 = self.pipeline.predict(df_new_processed)[0]
-
-        # Calculate total price
-        area = float(new_apartment["Area_m2"])
-        total_price = price_per_m2 * area
-
-        return f"Price per m²: {price_per_m2:.2f} EUR/m²\nTotal price: {total_price:.2f} EUR"
-
-
-model = PolynomialRegressionModel()
-print(model.evaluate())
+        if self.intervals is not None:
+            coverage = self.intervals.coverage(self._design(self.X_test), self.y_test)
+            report += f"90% interval coverage: {coverage:.1%}\n"
+        return report
+
+    @traced()
+    def predict_batch(self, df: pd.DataFrame, chunksize=100_000, interval=None) -> pd.DataFrame:
+        # Price per m² and total price for every row, preprocessed and predicted chunk by chunk.
+        # With interval=0.9, also the 5%/50%/95% bootstrap quantiles of both.
+        if interval and self.intervals is None:
+            raise ValueError("model was trained without n_bootstrap, no intervals available")
+        price_per_m2 = np.empty(len(df))
+        bounds = np.empty((len(df), 3)) if interval else None
+        q = interval_quantiles(interval) if interval else None
+        for start in range(0, len(df), chunksize):
+            chunk = df.iloc[start:start + chunksize]
+            design = self._design(self.prep.transform_array(chunk, scale=True))
+            with span("Ridge.predict", rows=len(design)):
+                price_per_m2[start:start + len(chunk)] = self.pipeline.named_steps["ridge"].predict(design)
+            if interval:
+                with span("BootstrapEnsemble.quantiles", rows=len(design)):
+                    bounds[start:start + len(chunk)] = self.intervals.quantiles(design, q)
+
+        area = self.prep.parse_area(df["Area_m2"])
+        result = pd.DataFrame({"Price_per_m2": price_per_m2, "Total_price": price_per_m2 * area}, index=df.index)
+        if interval:
+            result = pd.concat([result, interval_columns(bounds, area, df.index)], axis=1)
+        return result
+
+    @traced()
+    def predict_row(self, apartment: dict) -> float:
+        # price per m² for one apartment without pandas, for interactive use;
+        # the polynomial terms are products of feature powers, as PolynomialFeatures.powers_ lists them
+        x = self.prep.transform_row(apartment)
+        design = np.prod(x ** self.pipeline.named_steps["poly"].powers_, axis=1)
+        ridge = self.pipeline.named_steps["ridge"]
+        return float(ridge.coef_ @ design + ridge.intercept_)
+
+    def predict(self, new_apartment: dict, interval=None):
+        # Single apartment as a formatted string, via the batch path
+        prediction = self.predict_batch(pd.DataFrame([new_apartment]), interval=interval).iloc[0]
+        price_per_m2 = prediction["Price_per_m2"]
+        total_price = prediction["Total_price"]
+
+        text = f"Price per m²: {price_per_m2:.2f} EUR/m²\nTotal price: {total_price:.2f} EUR"
+        if interval:
+            text += (
+                f"\n{interval:.0%} range: {prediction['Price_per_m2_lower']:.0f} – "
+                f"{prediction['Price_per_m2_upper']:.0f} EUR/m², "
+                f"{prediction['Total_price_lower']:.0f} – {prediction['Total_price_upper']:.0f} EUR"
+            )
+        return text
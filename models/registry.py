@@ -0,0 +1,77 @@
+import hashlib
+import json
+import os
+import pickle
+
+from models.bootstrap import N_BOOTSTRAP
+from preprocessing.metadata import load_metadata, metadata_path, write_metadata
+from preprocessing.storage import resolve
+
+# bump when the artifact layout changes so stale pickles are retrained instead of loaded
+ARTIFACT_VERSION = 3
+ARTIFACT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "artifacts")
+# PolynomialRegressionModel parameters of the model the GUI loads; the pipeline trains the same ones
+# and `main.py train --bootstrap` matches them, so the GUI finds a stored artifact instead of retraining
+INTERVAL_MODEL_PARAMS = {"degree": 2, "ridge_alpha": 10.0, "n_bootstrap": N_BOOTSTRAP}
+
+
+class ModelRegistry:
+    def __init__(self, artifact_dir=ARTIFACT_DIR):
+        self.artifact_dir = artifact_dir
+        # fitted models already loaded in this process, keyed by fingerprint
+        self._models = {}
+        # data hashes keyed by (path, mtime, size) so unchanged files are not re-read
+        self._data_hashes = {}
+
+    def _data_hash(self, csv_path):
+        # hash whichever file (parquet, feather or csv) the models will actually read
+        path = os.path.abspath(resolve(csv_path))
+        stat = os.stat(path)
+        stamp = (path, stat.st_mtime_ns, stat.st_size)
+        if stamp not in self._data_hashes:
+            h = hashlib.sha256()
+            with open(path, "rb") as f:
+                for block in iter(lambda: f.read(1 << 20), b""):
+                    h.update(block)
+            self._data_hashes[stamp] = h.hexdigest()
+        return self._data_hashes[stamp]
+
+    def fingerprint(self, model_cls, csv_path, **params):
+        # content hash of the training data plus model name and hyperparameters
+        h = hashlib.sha256()
+        h.update(self._data_hash(csv_path).encode("utf-8"))
+        h.update(f"{model_cls.__name__}:{ARTIFACT_VERSION}".encode("utf-8"))
+        h.update(json.dumps(params, sort_keys=True).encode("utf-8"))
+        return h.hexdigest()[:16]
+
+    def artifact_path(self, model_cls, key):
+        return os.path.join(self.artifact_dir, f"{model_cls.__name__}-{key}.pkl")
+
+    def get(self, model_cls, csv_path, **params):
+        # return a fitted model, training only when data or hyperparameters changed
+        key = self.fingerprint(model_cls, csv_path, **params)
+        if key in self._models:
+            return self._models[key]
+
+        path = self.artifact_path(model_cls, key)
+        if os.path.exists(path):
+            with open(path, "rb") as f:
+                model = model_cls.from_artifact(pickle.load(f))
+        else:
+            model = model_cls(csv_path=csv_path, **params).train()
+            self.save(model, path)
+
+        # GUI metadata (vocabularies, ranges, floor lists) next to the artifacts, refreshed with the data
+        if load_metadata(csv_path, self.artifact_dir) is None:
+            write_metadata(csv_path, metadata_path(csv_path, self.artifact_dir))
+
+        self._models[key] = model
+        return model
+
+    def save(self, model, path):
+        # write to a temp file first so a crash never leaves a half-written artifact
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "wb") as f:
+            pickle.dump(model.to_artifact(), f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, path)
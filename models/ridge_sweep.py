@@ -0,0 +1,68 @@
+import numpy as np
+import pandas as pd
+from sklearn.preprocessing import PolynomialFeatures
+
+from models.polynomial_regression import PolynomialRegressionModel
+
+DEFAULT_ALPHAS = np.logspace(-2, 3, 21)
+
+
+def ridge_path(X_train, y_train, X_test, y_test, alphas):
+    # Ridge for every alpha from one SVD of the centred training matrix.
+    # Same solution as sklearn Ridge(fit_intercept=True); LOO and GCV come from the hat matrix.
+    alphas = np.asarray(alphas, dtype=np.float64)
+    n = X_train.shape[0]
+    x_mean = X_train.mean(axis=0)
+    y_mean = y_train.mean()
+    U, s, Vt = np.linalg.svd(X_train - x_mean, full_matrices=False)
+    Uty = U.T @ (y_train - y_mean)
+
+    # shrinkage factors, one row per alpha
+    s2 = s ** 2
+    shrink = s2 / (s2 + alphas[:, None])
+    coefs = (shrink / np.where(s > 0, s, 1) * Uty) @ Vt
+    intercepts = y_mean - coefs @ x_mean
+
+    # test-set error
+    test_pred = X_test @ coefs.T + intercepts
+    test_resid = y_test[:, None] - test_pred
+    test_rmse = np.sqrt(np.mean(test_resid ** 2, axis=0))
+    test_r2 = 1 - np.sum(test_resid ** 2, axis=0) / np.sum((y_test - y_test.mean()) ** 2)
+
+    # leave-one-out and generalized cross-validation on the training set (intercept adds 1/n to the hat diagonal)
+    train_resid = (y_train - y_mean)[:, None] - U @ (shrink * Uty).T
+    hat_diag = (U ** 2) @ shrink.T + 1.0 / n
+    loo_rmse = np.sqrt(np.mean((train_resid / (1 - hat_diag)) ** 2, axis=0))
+    dof = shrink.sum(axis=1) + 1
+    gcv_rmse = np.sqrt(np.mean(train_resid ** 2, axis=0)) / (1 - dof / n)
+
+    return {
+        "coefs": coefs,
+        "intercepts": intercepts,
+        "table": pd.DataFrame({
+            "alpha": alphas,
+            "test_rmse": test_rmse,
+            "test_r2": test_r2,
+            "loo_rmse": loo_rmse,
+            "gcv_rmse": gcv_rmse,
+            "effective_dof": dof,
+        }),
+    }
+
+
+def sweep(csv_path, degrees=(1, 2), alphas=DEFAULT_ALPHAS):
+    # preprocess and split once, expand once per degree, then every alpha in one step
+    base = PolynomialRegressionModel(csv_path=csv_path).load_data()
+    y_train = np.asarray(base.y_train, dtype=np.float64)
+    y_test = np.asarray(base.y_test, dtype=np.float64)
+
+    tables = []
+    for degree in degrees:
+        poly = PolynomialFeatures(degree=degree, include_bias=False, interaction_only=True)
+        X_train = poly.fit_transform(base.X_train)
+        X_test = poly.transform(base.X_test)
+        table = ridge_path(X_train, y_train, X_test, y_test, alphas)["table"]
+        table.insert(0, "degree", degree)
+        table.insert(1, "n_features", X_train.shape[1])
+        tables.append(table)
+    return pd.concat(tables, ignore_index=True)
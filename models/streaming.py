@@ -0,0 +1,73 @@
+import numpy as np
+
+from preprocessing.numeric_encoding import ApartmentPreprocessor
+from preprocessing.storage import iter_table
+
+TRAINING_COLUMNS = ApartmentPreprocessor.INPUT_COLUMNS + ["Price_per_m2"]
+
+
+class GramAccumulator:
+    # running XᵀX, Xᵀy and column sums, enough to solve least squares / Ridge with an intercept
+    def __init__(self):
+        self.n = 0
+        self.xtx = None
+        self.xty = None
+        self.x_sum = None
+        self.y_sum = 0.0
+
+    def update(self, X, y, weights=None):
+        # `weights` counts each row that many times, e.g. bootstrap resample counts
+        if self.xtx is None:
+            self.xtx = np.zeros((X.shape[1], X.shape[1]))
+            self.xty = np.zeros(X.shape[1])
+            self.x_sum = np.zeros(X.shape[1])
+        if weights is None:
+            self.n += X.shape[0]
+            self.xtx += X.T @ X
+            self.xty += X.T @ y
+            self.x_sum += X.sum(axis=0)
+            self.y_sum += y.sum()
+        else:
+            Xw = X * weights[:, None]
+            self.n += weights.sum()
+            self.xtx += Xw.T @ X
+            self.xty += Xw.T @ y
+            self.x_sum += Xw.sum(axis=0)
+            self.y_sum += weights @ y
+        return self
+
+    def solve(self, alpha=0.0):
+        # centre the normal equations like sklearn does, so the intercept is not penalised
+        x_mean = self.x_sum / self.n
+        y_mean = self.y_sum / self.n
+        gram = self.xtx - self.n * np.outer(x_mean, x_mean)
+        rhs = self.xty - self.n * x_mean * y_mean
+        if alpha > 0:
+            coef = np.linalg.solve(gram + alpha * np.eye(len(gram)), rhs)
+        else:
+            # one-hot blocks are collinear with the intercept: take the minimum-norm solution
+            coef = np.linalg.lstsq(gram, rhs, rcond=1e-12)[0]
+        return coef, y_mean - x_mean @ coef
+
+
+def fit_preprocessor(path, chunksize, municipality_encoding="rank"):
+    # two passes: municipality/vocabulary statistics, then the scaler (which needs the scores).
+    # Rank encoding only: out-of-fold target encoding needs the rows in memory, so the models refuse it here.
+    prep = ApartmentPreprocessor(municipality_encoding=municipality_encoding)
+    for chunk in iter_table(path, chunksize, columns=ApartmentPreprocessor.INPUT_COLUMNS):
+        prep.partial_fit(chunk)
+    prep.finish_partial_fit()
+    for chunk in iter_table(path, chunksize, columns=ApartmentPreprocessor.INPUT_COLUMNS):
+        prep.partial_fit_scaler(chunk)
+    return prep
+
+
+def accumulate_gram(path, chunksize, prep, expand=None):
+    # third pass: model-ready chunks into XᵀX / Xᵀy; `expand` maps features to the design matrix
+    gram = GramAccumulator()
+    for chunk in iter_table(path, chunksize, columns=TRAINING_COLUMNS):
+        X = prep.transform_array(chunk, scale=True)
+        if expand is not None:
+            X = expand(X)
+        gram.update(X, chunk["Price_per_m2"].to_numpy(dtype=np.float64))
+    return gram
@@ -0,0 +1,53 @@
+import numpy as np
+import pandas as pd
+from scripts.scorebook import CONDITION_MAP
+from preprocessing.numeric_encoding import ApartmentPreprocessor
+
+
+class CategoryCodePreprocessor:
+    # Unscaled numeric columns plus integer codes for the categorical ones, for tree models:
+    # no one-hot or polynomial expansion, and no municipality ranking (the trees split on codes directly)
+    INPUT_COLUMNS = ApartmentPreprocessor.INPUT_COLUMNS
+    NUMERIC_FEATURES = ["Area_m2", "Rooms", "Floor_num", "Is_top_floor", "Parking_effect", "Condition",
+                        "Negative_floor"]
+    CATEGORICAL_FEATURES = ["Municipality", "Type", "Heating"]
+    # HistGradientBoosting bins categories into at most 255 bins, one is kept for missing values
+    MAX_CATEGORIES = 254
+    parse_area = staticmethod(ApartmentPreprocessor.parse_area)
+
+    def __init__(self):
+        self.vocabularies = None
+        self.feature_names_ = self.NUMERIC_FEATURES + self.CATEGORICAL_FEATURES
+
+    @property
+    def categorical_mask(self):
+        return np.array([name in self.CATEGORICAL_FEATURES for name in self.feature_names_])
+
+    def fit(self, df: pd.DataFrame):
+        # most frequent categories first; the rare tail beyond MAX_CATEGORIES is treated as missing
+        self.vocabularies = {}
+        for col in self.CATEGORICAL_FEATURES:
+            counts = df[col].astype(object).fillna("Ostalo").value_counts()
+            self.vocabularies[col] = list(counts.index[:self.MAX_CATEGORIES])
+        return self
+
+    def fit_transform_array(self, df: pd.DataFrame) -> np.ndarray:
+        return self.fit(df).transform_array(df)
+
+    def transform_array(self, df: pd.DataFrame) -> np.ndarray:
+        X = np.empty((len(df), len(self.feature_names_)), dtype=np.float64)
+        X[:, 0] = self.parse_area(df["Area_m2"])
+        X[:, 1] = df["Rooms"].to_numpy(dtype=np.float64)
+        X[:, 2], X[:, 3], X[:, 6] = ApartmentPreprocessor.decode_floors(df["Floor"])
+        X[:, 4] = df["Parking_garage"].fillna(0).astype(int).to_numpy()
+        X[:, 4] += df["Parking_outdoor"].fillna(0).astype(int).to_numpy()
+        X[:, 5] = ApartmentPreprocessor.lookup(df["Condition"], CONDITION_MAP,
+                                               missing=CONDITION_MAP["Ostalo"], default=np.nan)
+
+        # unseen categories become NaN, which the trees route like missing values
+        offset = len(self.NUMERIC_FEATURES)
+        for i, col in enumerate(self.CATEGORICAL_FEATURES):
+            positions = {c: code for code, c in enumerate(self.vocabularies[col])}
+            missing = positions.get("Ostalo", np.nan)
+            X[:, offset + i] = ApartmentPreprocessor.lookup(df[col], positions, missing=missing, default=np.nan)
+        return X
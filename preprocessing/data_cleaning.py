@@ -1,28 +1,37 @@
-import pandas as pd
+import argparse
 import ast
 
-# Load CSVs
-df_basic = pd.read_csv("../data/raw/serbian_apartments_basic.csv")
-df_details = pd.read_csv("../data/raw/serbian_apartments_details.csv")
+import pandas as pd
+
+from preprocessing.storage import read_table, write_table
+from scripts.instrumentation import traced
+from scripts.paths import BASIC_CSV, CLEAN_CSV, DETAILS_CSV
+from scripts.url_index import LISTING_ID_RE
 
-# Remove duplicate URL column if present
-if "URL" in df_details.columns:
-    df_details = df_details.loc[:, df_details.columns != "URL"]
 
+DETAILS_COLUMNS = ["Type", "Condition", "Heating", "Parking_garage", "Parking_outdoor"]
+
+# Details are stringified lists written by scrape_basic.py, e.g. "['66 m', '3.5', 'II/8']".
+# Only the first three items are used. Group 1 marks a match; rows with quoting this pattern
+# does not cover (escapes, double quotes, non-list values) go through literal_eval instead.
+DETAILS_PATTERN = (
+    r"^(\[)(?:'([^'\\]*)'(?:, '([^'\\]*)'(?:, '([^'\\]*)'(?:, '[^'\\]*')*)?)?)?\]$"
+)
 
-# Function to split the location into separate columns
-def split_location(location):
-    parts = [x.strip() for x in location.split(',')]
-    while len(parts) < 5:
-        parts.append('')
-    return pd.Series({
-        'City': parts[0] if parts[0] != '' else 'Ostalo',
-        'Municipality': parts[2] if parts[2] != '' else 'Ostalo',
-    })
 
+@traced()
+def parse_location(locations: pd.Series) -> pd.DataFrame:
+    # "Beograd, Opština , Voždovac, Banjica, ..." -> City is part 0, Municipality part 2, Neighbourhood part 3
+    parts = locations.str.split(",", n=4, expand=True).reindex(columns=range(4))
+    city = parts[0].str.strip().fillna("").replace("", "Ostalo")
+    municipality = parts[2].str.strip().fillna("").replace("", "Ostalo")
+    neighbourhood = parts[3].str.strip().fillna("").replace("", "Ostalo")
+    return pd.DataFrame({"City": city, "Municipality": municipality, "Neighbourhood": neighbourhood},
+                        index=locations.index)
 
-# Function to split details into area, rooms, and floor
-def split_details(details):
+
+def _details_from_literal(details):
+    # slow path for the rare rows the regex does not cover
     try:
         details_list = ast.literal_eval(details)
         area = details_list[0].replace(' m', '') if len(details_list) > 0 and details_list[0] != '' else None
@@ -34,52 +43,129 @@ def split_details(details):
         else:
             rooms = float(rooms) if rooms is not None else None
 
-        return pd.Series({
-            'Area_m2': area,
-            'Rooms': rooms,
-            'Floor': floor
-        })
-    except:
-        return pd.Series({
-            'Area_m2': None,
-            'Rooms': None,
-            'Floor': 'Ostalo'
-        })
-
-
-# Apply location and details transformations
-location_df = df_basic['Location'].apply(split_location)
-details_df_split = df_basic['Details'].apply(split_details)
-
-# Create cleaned basic DataFrame
-df_basic_clean = pd.concat([df_basic[["URL", "Title", "Price"]], location_df, details_df_split], axis=1)
-
-# Select relevant columns from details CSV
-cols_to_add = ["Type", "Condition", "Heating", "Parking_garage", "Parking_outdoor"]
-df_details_subset = df_details[cols_to_add]
-
-# Fill missing categorical values with 'Ostalo' only for Type, Condition, Heating
-categorical_cols = ["Type", "Condition", "Heating"]
-df_details_subset[categorical_cols] = df_details_subset[categorical_cols].fillna('Ostalo')
-df_details_subset[categorical_cols] = df_details_subset[categorical_cols].replace('', 'Ostalo')
-
-# Combine basic and detailed DataFrames
-df_combine = pd.concat([df_basic_clean, df_details_subset], axis=1).reset_index(drop=True)
-
-# clean price and area, compute price per m2
-df_combine["Price"] = (
-            df_combine["Price"].astype(str)
-            .str.replace(r"[€.]", "", regex=True)
-            .str.replace(",", ".", regex=False)
-            .str.replace(r"\s+", "", regex=True)
-        ).astype(float)
-df_combine["Area_m2"] = df_combine["Area_m2"].astype(str).str.replace(",", ".").astype(float)
-df_combine["Price_per_m2"] = (
-    (df_combine["Price"] / df_combine["Area_m2"])
-    .round(3)  # round to 3 decimals
-)
-
-# Save the cleaned CSV
-df_combine.to_csv("../data/processed/serbian_apartments_clean.csv", index=False, encoding="utf-8-sig")
-
-print(f"Cleaned and combined data saved with {len(df_combine)} rows.")
+        return area, rooms, floor
+    except Exception:
+        return None, None, 'Ostalo'
+
+
+@traced()
+def parse_details(details: pd.Series) -> pd.DataFrame:
+    # split details into area, rooms and floor for the whole column at once
+    groups = details.astype(str).str.extract(DETAILS_PATTERN)
+    matched = groups[0].notna()
+
+    area = groups[1].where(groups[1] != "").str.replace(" m", "", regex=False)
+    rooms_raw = groups[2].where(groups[2] != "")
+    rooms = pd.to_numeric(rooms_raw.str.replace("+", "", regex=False), errors="coerce")
+    floor = groups[3].where(groups[3] != "").fillna("Ostalo")
+
+    result = pd.DataFrame({"Area_m2": area.astype(object), "Rooms": rooms, "Floor": floor})
+    result["Area_m2"] = result["Area_m2"].where(result["Area_m2"].notna(), None)
+
+    # rooms that didn't convert cleanly get float()'s exact semantics on the slow path
+    slow = ~matched | (rooms_raw.notna() & rooms.isna())
+    if slow.any():
+        fallback = [_details_from_literal(val) for val in details[slow]]
+        result.loc[slow, ["Area_m2", "Rooms", "Floor"]] = pd.DataFrame(
+            fallback, index=details.index[slow], columns=["Area_m2", "Rooms", "Floor"]
+        ).astype({"Area_m2": object})
+    return result
+
+
+def listing_ids(urls: pd.Series) -> pd.Series:
+    # numeric ad ID from the halooglasi URL; slug and query string vary between scrapes
+    return urls.astype(str).str.extract(LISTING_ID_RE.pattern)[0]
+
+
+@traced()
+def merge_details(df_basic: pd.DataFrame, df_details: pd.DataFrame):
+    # attach details to listings by ad ID, so both scrapers can run in any order and incrementally
+    basic = df_basic.assign(Listing_ID=listing_ids(df_basic["URL"]))
+    details = df_details.assign(Listing_ID=listing_ids(df_details["URL"]))
+
+    # a listing scraped more than once keeps its latest row
+    basic_dupes = basic["Listing_ID"].notna() & basic.duplicated("Listing_ID", keep="last")
+    basic = basic[~basic_dupes]
+    details = details.dropna(subset=["Listing_ID"])
+    details_dupes = details.duplicated("Listing_ID", keep="last")
+    details = details[~details_dupes].set_index("Listing_ID")[DETAILS_COLUMNS]
+
+    # hash join against the details index
+    merged = basic.join(details, on="Listing_ID", how="left")
+    matched = basic["Listing_ID"].isin(details.index)
+
+    report = {
+        "listings": len(basic),
+        "matched": int(matched.sum()),
+        "without_details": int((~matched).sum()),
+        "details_without_listing": int((~details.index.isin(basic["Listing_ID"])).sum()),
+        "duplicate_listings": int(basic_dupes.sum()),
+        "duplicate_details": int(details_dupes.sum()),
+    }
+    return merged.reset_index(drop=True), report
+
+
+@traced()
+def clean(df_basic: pd.DataFrame, df_details: pd.DataFrame):
+    # returns the cleaned table and the merge report
+    df_merged, report = merge_details(df_basic, df_details)
+
+    # Split location and details into separate columns
+    location_df = parse_location(df_merged['Location'])
+    details_df_split = parse_details(df_merged['Details'])
+
+    # Combine listing and detail columns
+    df_combine = pd.concat([df_merged[["URL", "Listing_ID", "Title", "Price"]], location_df, details_df_split,
+                            df_merged[DETAILS_COLUMNS]], axis=1)
+
+    # Fill missing categorical values with 'Ostalo' only for Type, Condition, Heating
+    categorical_cols = ["Type", "Condition", "Heating"]
+    df_combine[categorical_cols] = df_combine[categorical_cols].astype(object).fillna('Ostalo')
+    df_combine[categorical_cols] = df_combine[categorical_cols].replace('', 'Ostalo')
+
+    # Listings without scraped details have no parking flags
+    parking_cols = ["Parking_garage", "Parking_outdoor"]
+    df_combine[parking_cols] = df_combine[parking_cols].fillna(0).astype(int)
+
+    # clean price and area, compute price per m2
+    df_combine["Price"] = (
+                df_combine["Price"].astype(str)
+                .str.replace(r"[€.]", "", regex=True)
+                .str.replace(",", ".", regex=False)
+                .str.replace(r"\s+", "", regex=True)
+            ).astype(float)
+    # details without an area (e.g. "[]") become NaN instead of failing the whole table
+    df_combine["Area_m2"] = pd.to_numeric(df_combine["Area_m2"].astype(str).str.replace(",", "."), errors="coerce")
+    df_combine["Price_per_m2"] = (
+        (df_combine["Price"] / df_combine["Area_m2"])
+        .round(3)  # round to 3 decimals
+    )
+    return df_combine, report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Combine and clean the raw scraped tables")
+    parser.add_argument("--basic", default=BASIC_CSV)
+    parser.add_argument("--details", default=DETAILS_CSV)
+    parser.add_argument("--output", default=CLEAN_CSV)
+    parser.add_argument("--format", choices=["parquet", "feather", "csv"], default="parquet")
+    args = parser.parse_args(argv)
+
+    # Load raw tables (whichever of parquet/feather/csv is newest)
+    df_basic = read_table(args.basic, typed=False)
+    df_details = read_table(args.details)
+
+    df_combine, report = clean(df_basic, df_details)
+    print(f"Matched {report['matched']} of {report['listings']} listings with details: "
+          f"{report['without_details']} without details, "
+          f"{report['details_without_listing']} details without a listing, "
+          f"{report['duplicate_listings'] + report['duplicate_details']} re-scraped duplicates dropped.")
+
+    # Save the cleaned table
+    path = write_table(df_combine, args.output, args.format)
+
+    print(f"Cleaned and combined data saved with {len(df_combine)} rows to {path}.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+import json
+import os
+
+from scripts.scorebook import ROMAN_MAP
+
+# Small JSON summary of the training data for the GUI: combo-box vocabularies, field ranges and
+# floor option lists. Written by the model registry after training; reading it needs no pandas.
+METADATA_VERSION = 1
+# next to the default model artifacts
+METADATA_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "models", "artifacts")
+VOCABULARY_FIELDS = ["Municipality", "Rooms", "Type", "Condition", "Heating"]
+# formats preprocessing.storage.resolve chooses between
+SOURCE_FORMATS = ["parquet", "feather", "csv"]
+
+
+def floor_options(total):
+    # "PR/5", "VPR/5", "I/5" ... "V/5" for a building with `total` floors
+    options = [f"PR/{total}", f"VPR/{total}"]
+    options.extend(f"{roman}/{total}" for roman, value in ROMAN_MAP.items() if value <= total)
+    return options
+
+
+def metadata_path(csv_path, directory=METADATA_DIR):
+    name = os.path.splitext(os.path.basename(csv_path))[0]
+    return os.path.join(directory, f"{name}.meta.json")
+
+
+def current_source(csv_path):
+    # same choice as preprocessing.storage.resolve (newest of the .parquet/.feather/.csv siblings),
+    # without importing pandas
+    root = os.path.splitext(csv_path)[0]
+    existing = [p for p in (f"{root}.{fmt}" for fmt in SOURCE_FORMATS) if os.path.exists(p)]
+    return max(existing, key=os.path.getmtime) if existing else csv_path
+
+
+def build_metadata(csv_path):
+    # the only part that touches the data, and so the only one importing pandas
+    from preprocessing.storage import read_table, resolve
+
+    source = resolve(csv_path)
+    df = read_table(source, columns=VOCABULARY_FIELDS + ["Area_m2", "Floor"])
+    total_floors = df["Floor"].astype(str).str.extract(r"/(\d+)$")[0].astype(float)
+
+    vocabularies = {col: df[col].dropna().unique().tolist() for col in ["Municipality", "Type", "Condition", "Heating"]}
+    vocabularies["Rooms"] = sorted(df["Rooms"].dropna().astype(float).unique().tolist())
+    ranges = {}
+    for name, values in (("Area_m2", df["Area_m2"].astype(float)), ("Rooms", df["Rooms"].astype(float)),
+                         ("Total_floors", total_floors)):
+        ranges[name] = [float(values.min()), float(values.max())] if values.notna().any() else None
+
+    # every total up to the tallest building seen (at least all Roman-numeral floors)
+    max_total = max(int(ranges["Total_floors"][1]) if ranges["Total_floors"] else 0, max(ROMAN_MAP.values()))
+    stat = os.stat(source)
+    return {
+        "version": METADATA_VERSION,
+        "source": {"path": os.path.abspath(source), "mtime_ns": stat.st_mtime_ns, "size": stat.st_size},
+        "rows": len(df),
+        "vocabularies": vocabularies,
+        "ranges": ranges,
+        "floor_options": {str(total): floor_options(total) for total in range(max_total + 1)},
+    }
+
+
+def write_metadata(csv_path, path=None):
+    # atomic like the model artifacts; returns the metadata written
+    path = path or metadata_path(csv_path)
+    metadata = build_metadata(csv_path)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(metadata, f, ensure_ascii=False)
+    os.replace(tmp_path, path)
+    return metadata
+
+
+def load_metadata(csv_path, directory=METADATA_DIR):
+    # the stored metadata, or None when it is missing or the data file changed since it was written,
+    # including a newer sibling format (e.g. a .parquet written after the .csv) taking over
+    source = os.path.abspath(current_source(csv_path))
+    try:
+        with open(metadata_path(csv_path, directory), encoding="utf-8") as f:
+            metadata = json.load(f)
+        stored = metadata["source"]
+        stat = os.stat(source)
+    except (OSError, ValueError, KeyError, TypeError):
+        return None
+    if metadata.get("version") != METADATA_VERSION:
+        return None
+    if (source, stat.st_mtime_ns, stat.st_size) != (stored.get("path"), stored.get("mtime_ns"), stored.get("size")):
+        return None
+    return metadata
@@ -3,13 +3,31 @@ import numpy as np
 import re
 from sklearn.preprocessing import StandardScaler
 from scripts.scorebook import FLOOR_MAP, ROMAN_MAP, CONDITION_MAP
+from preprocessing.storage import read_table, write_table
+from preprocessing.target_encoding import TargetEncoder
+from scripts.instrumentation import count, traced
+from scripts.paths import CLEAN_CSV, ENCODED_CSV
 
 
 class ApartmentPreprocessor:
-    def __init__(self, random_state=42):
+    # columns of the cleaned table the preprocessor reads
+    INPUT_COLUMNS = ["Price", "Municipality", "Area_m2", "Rooms", "Floor", "Type", "Condition", "Heating",
+                     "Parking_garage", "Parking_outdoor"]
+    # scaled numeric features, followed by the one-hot Type_str_*/Heating_str_* columns
+    NUMERIC_FEATURES = ["Area_m2", "Rooms", "Floor_num", "Is_top_floor",
+                        "Parking_effect", "Municipality_score", "Condition", "Negative_floor"]
+
+    def __init__(self, random_state=42, municipality_encoding="rank", smoothing=20.0):
         # for scaling numbers and reproducibility
         self.scaler = None
         self.municipality_score = None
+        # "rank": rank of the mean municipality price; "target": smoothed mean price (TargetEncoder)
+        self.municipality_encoding = municipality_encoding
+        self.smoothing = smoothing
+        self.target_encoder = None
+        self.type_categories = None
+        self.heating_categories = None
+        self.feature_names_ = None
         self.random_state = random_state
         np.random.seed(self.random_state)
 
@@ -51,87 +69,222 @@ class ApartmentPreprocessor:
 
         return floor_num, is_top, is_negative_floor
 
+    @classmethod
+    @traced()
+    def decode_floors(cls, floors: pd.Series):
+        # decode every distinct floor string once, then broadcast the lookup table over the rows
+        codes, uniques = pd.factorize(floors)
+        count("floor_to_num", len(uniques))
+        # last row of the table catches missing values (factorize code -1)
+        table = np.array([cls.floor_to_num(val) for val in uniques] + [(0, 0, 0)], dtype=np.int64)
+        decoded = table[codes]
+        return decoded[:, 0], decoded[:, 1], decoded[:, 2]
+
+    @staticmethod
+    def lookup(values: pd.Series, table: dict, missing, default) -> np.ndarray:
+        # map each distinct value once and gather: NaN -> missing, values not in table -> default
+        codes, uniques = pd.factorize(values)
+        lut = np.array([table.get(val, default) for val in uniques] + [missing], dtype=np.float64)
+        return lut[codes]
+
+    @staticmethod
+    def parse_price(price: pd.Series) -> np.ndarray:
+        # cleaned tables already hold floats; only raw text like "150.000 €" needs parsing
+        if pd.api.types.is_numeric_dtype(price):
+            return price.to_numpy(dtype=np.float64)
+        return (
+            price.astype(str)
+            .str.replace(r"[€.]", "", regex=True)
+            .str.replace(",", ".", regex=False)
+            .str.replace(r"\s+", "", regex=True)
+        ).astype(float).to_numpy()
+
+    @staticmethod
+    def parse_area(area: pd.Series) -> np.ndarray:
+        if pd.api.types.is_numeric_dtype(area):
+            return area.to_numpy(dtype=np.float64)
+        return area.astype(str).str.replace(",", ".").astype(float).to_numpy()
+
+    @staticmethod
+    def categories(values: pd.Series):
+        # sorted vocabulary with missing values counted as "Ostalo", like get_dummies after fillna
+        uniques = set(pd.unique(values.dropna().astype(object)))
+        if values.isna().any():
+            uniques.add("Ostalo")
+        return sorted(uniques)
+
     def fit(self, df: pd.DataFrame):
-        # compute municipality score and fit scaler
-        df = self.transform_base(df)
+        self.fit_transform_array(df, scale=False)
+        return self
 
-        avg_prices = df.groupby("Municipality")["Price"].mean().sort_values(ascending=False)
+    @traced()
+    def fit_transform_array(self, df: pd.DataFrame, scale=True) -> np.ndarray:
+        # fit municipality score, one-hot vocabulary and scaler while building the matrix, in one pass
+        price = pd.Series(self.parse_price(df["Price"]), index=df.index)
+        avg_prices = price.groupby(df["Municipality"], observed=True).mean().sort_values(ascending=False)
         self.municipality_score = {mun: len(avg_prices) - rank for rank, mun in enumerate(avg_prices.index)}
-        df["Municipality_score"] = df["Municipality"].map(self.municipality_score).fillna(0)
 
-        df_model = self.transform_features(df)
+        # training rows get out-of-fold target encodings so their own price doesn't leak in
+        municipality = None
+        if self.municipality_encoding == "target":
+            self.target_encoder = TargetEncoder(("Municipality",), "Price", self.smoothing)
+            municipality = self.target_encoder.fit_transform_oof(
+                pd.DataFrame({"Municipality": df["Municipality"], "Price": price}), random_state=self.random_state
+            )[:, 0]
+
+        self.type_categories = self.categories(df["Type"])
+        self.heating_categories = self.categories(df["Heating"])
+        self.feature_names_ = self.NUMERIC_FEATURES + \
+            [f"Type_str_{c}" for c in self.type_categories] + \
+            [f"Heating_str_{c}" for c in self.heating_categories]
 
-        cols_to_scale = ["Area_m2", "Rooms", "Floor_num", "Is_top_floor",
-                         "Parking_effect", "Municipality_score", "Condition", "Negative_floor"]
+        X = self._build(df, municipality)
         self.scaler = StandardScaler()
-        self.scaler.fit(df_model[cols_to_scale])
+        self.scaler.fit(X[:, :len(self.NUMERIC_FEATURES)])
+        if scale:
+            self._scale(X)
+        return X
 
+    @traced()
+    def partial_fit(self, df: pd.DataFrame):
+        # accumulate municipality price sums/counts and the category vocabularies from one chunk;
+        # call finish_partial_fit() after the last chunk, then partial_fit_scaler() over the chunks again
+        if not hasattr(self, "_price_sums"):
+            self._price_sums, self._price_counts = {}, {}
+            self._type_seen, self._heating_seen = set(), set()
+        price = pd.Series(self.parse_price(df["Price"]), index=df.index)
+        grouped = price.groupby(df["Municipality"].astype(object)).agg(["sum", "count"])
+        for mun, (total, n) in zip(grouped.index, grouped.to_numpy()):
+            self._price_sums[mun] = self._price_sums.get(mun, 0.0) + total
+            self._price_counts[mun] = self._price_counts.get(mun, 0) + n
+        self._type_seen.update(self.categories(df["Type"]))
+        self._heating_seen.update(self.categories(df["Heating"]))
+        if self.municipality_encoding == "target":
+            if self.target_encoder is None:
+                self.target_encoder = TargetEncoder(("Municipality",), "Price", self.smoothing)
+            self.update_target_stats(df)
         return self
 
-    def transform(self, df: pd.DataFrame, scale=True):
-        # transform data to model-ready features
-        df = self.transform_base(df)
-        df["Municipality_score"] = df["Municipality"].map(self.municipality_score).fillna(0)
-        df_model = self.transform_features(df)
+    def update_target_stats(self, df: pd.DataFrame):
+        # fold newly scraped listings into the municipality target encoding without a full regroup
+        self.target_encoder.partial_fit(
+            pd.DataFrame({"Municipality": df["Municipality"], "Price": self.parse_price(df["Price"])})
+        )
+        return self
+
+    def finish_partial_fit(self):
+        # same ranking and vocabulary fit() computes in memory
+        avg_prices = pd.Series({mun: self._price_sums[mun] / self._price_counts[mun]
+                                if self._price_counts[mun] else np.nan
+                                for mun in sorted(self._price_sums)}, dtype=np.float64)
+        avg_prices = avg_prices.sort_values(ascending=False)
+        self.municipality_score = {mun: len(avg_prices) - rank for rank, mun in enumerate(avg_prices.index)}
 
+        self.type_categories = sorted(self._type_seen)
+        self.heating_categories = sorted(self._heating_seen)
+        self.feature_names_ = self.NUMERIC_FEATURES + \
+            [f"Type_str_{c}" for c in self.type_categories] + \
+            [f"Heating_str_{c}" for c in self.heating_categories]
+        self.scaler = StandardScaler()
+        del self._price_sums, self._price_counts, self._type_seen, self._heating_seen
+        return self
+
+    def partial_fit_scaler(self, df: pd.DataFrame):
+        self.scaler.partial_fit(self._build(df)[:, :len(self.NUMERIC_FEATURES)])
+        return self
+
+    @traced()
+    def transform_array(self, df: pd.DataFrame, scale=True) -> np.ndarray:
+        # dense feature matrix with the column order fixed at fit time
+        X = self._build(df)
         if scale:
-            cols_to_scale = ["Area_m2", "Rooms", "Floor_num", "Is_top_floor",
-                             "Parking_effect", "Municipality_score", "Condition", "Negative_floor"]
-            df_model[cols_to_scale] = self.scaler.transform(df_model[cols_to_scale])
+            self._scale(X)
+        return X
 
-        return df_model
+    def transform(self, df: pd.DataFrame, scale=True):
+        # same features as a labelled DataFrame
+        return pd.DataFrame(self.transform_array(df, scale=scale), columns=self.feature_names_, index=df.index)
 
-    def fit_transform(self, df: pd.DataFrame, scale=True):
-        # just fit and transform at the same time
-        return self.fit(df).transform(df, scale=scale)
-
-    def transform_base(self, df):
-        # clean price and area
-        df = df.copy()
-        df["Price"] = (
-            df["Price"].astype(str)
-            .str.replace(r"[€.]", "", regex=True)
-            .str.replace(",", ".", regex=False)
-            .str.replace(r"\s+", "", regex=True)
-        ).astype(float)
-        df["Area_m2"] = df["Area_m2"].astype(str).str.replace(",", ".").astype(float)
-        return df
+    def transform_row(self, row: dict, scale=True) -> np.ndarray:
+        # transform_array() for a single record without pandas, for interactive use
+        x = np.zeros(len(self.feature_names_))
+        area = row["Area_m2"]
+        x[0] = float(area.replace(",", ".") if isinstance(area, str) else area)
+        x[1] = float(row["Rooms"])
+        x[2], x[3], x[7] = self.floor_to_num(row["Floor"])
+        x[4] = sum(0 if pd.isna(row.get(col)) else int(row[col]) for col in ("Parking_garage", "Parking_outdoor"))
 
-    def transform_features(self, df):
-        # make features for model
-        df = df.copy()
+        municipality = row.get("Municipality")
+        if self.municipality_encoding == "target":
+            x[5] = self.target_encoder.transform_one(row)
+        else:
+            x[5] = 0 if pd.isna(municipality) else self.municipality_score.get(municipality, 0)
 
-        # floor info
-        df[["Floor_num", "Is_top_floor", "Negative_floor"]] = df["Floor"].apply(
-            lambda x: pd.Series(self.floor_to_num(x)))
+        condition = row.get("Condition")
+        x[6] = CONDITION_MAP["Ostalo"] if pd.isna(condition) else CONDITION_MAP.get(condition, np.nan)
 
-        # parking effect
-        df["Parking_garage"] = df["Parking_garage"].fillna(0).astype(int)
-        df["Parking_outdoor"] = df["Parking_outdoor"].fillna(0).astype(int)
-        df["Parking_effect"] = df["Parking_garage"] + df["Parking_outdoor"]
+        offset = len(self.NUMERIC_FEATURES)
+        for col, categories in (("Type", self.type_categories), ("Heating", self.heating_categories)):
+            value = row.get(col)
+            value = "Ostalo" if pd.isna(value) else value
+            if value in categories:
+                x[offset + categories.index(value)] = 1.0
+            offset += len(categories)
+
+        if scale:
+            n_numeric = len(self.NUMERIC_FEATURES)
+            x[:n_numeric] = (x[:n_numeric] - self.scaler.mean_) / self.scaler.scale_
+        return x
+
+    def fit_transform(self, df: pd.DataFrame, scale=True):
+        return pd.DataFrame(self.fit_transform_array(df, scale=scale), columns=self.feature_names_, index=df.index)
+
+    def _scale(self, X):
+        n_numeric = len(self.NUMERIC_FEATURES)
+        X[:, :n_numeric] -= self.scaler.mean_
+        X[:, :n_numeric] /= self.scaler.scale_
 
-        # fill missing categories
-        df["Type_str"] = df["Type"].fillna("Ostalo")
-        df["Heating_str"] = df["Heating"].fillna("Ostalo")
+    @traced()
+    def _build(self, df: pd.DataFrame, municipality=None) -> np.ndarray:
+        # fill the feature matrix column by column straight from the input columns, no frame copies
+        X = np.zeros((len(df), len(self.feature_names_)), dtype=np.float64)
 
-        # convert condition to number
-        df["Condition"] = df["Condition"].fillna("Ostalo").map(CONDITION_MAP)
+        X[:, 0] = self.parse_area(df["Area_m2"])
+        X[:, 1] = df["Rooms"].to_numpy(dtype=np.float64)
 
-        # one-hot for type and heating
-        df_encoded = pd.get_dummies(df, columns=["Type_str", "Heating_str"])
+        # floor info
+        X[:, 2], X[:, 3], X[:, 7] = self.decode_floors(df["Floor"])
+
+        # parking effect
+        X[:, 4] = df["Parking_garage"].fillna(0).astype(int).to_numpy()
+        X[:, 4] += df["Parking_outdoor"].fillna(0).astype(int).to_numpy()
 
-        # pick features
-        features = ["Area_m2", "Rooms", "Floor_num", "Is_top_floor",
-                    "Parking_effect", "Municipality_score", "Condition", "Negative_floor"] + \
-                   [col for col in df_encoded.columns if col.startswith(("Type_str_", "Heating_str_"))]
+        if municipality is not None:
+            X[:, 5] = municipality
+        elif self.municipality_encoding == "target":
+            X[:, 5] = self.target_encoder.transform(df)[:, 0]
+        else:
+            # unseen municipalities score 0
+            X[:, 5] = self.lookup(df["Municipality"], self.municipality_score, missing=0, default=0)
 
-        df_model = df_encoded[features].copy()
+        # condition to number, missing counts as "Ostalo"
+        X[:, 6] = self.lookup(df["Condition"], CONDITION_MAP, missing=CONDITION_MAP["Ostalo"], default=np.nan)
 
-        return df_model
+        # one-hot for type and heating; categories unseen at fit time stay all-zero
+        rows = np.arange(len(df))
+        offset = len(self.NUMERIC_FEATURES)
+        for col, categories in (("Type", self.type_categories), ("Heating", self.heating_categories)):
+            positions = {c: i for i, c in enumerate(categories)}
+            codes = self.lookup(df[col], positions, missing=positions.get("Ostalo", -1), default=-1).astype(np.intp)
+            known = codes >= 0
+            X[rows[known], offset + codes[known]] = 1.0
+            offset += len(categories)
+        return X
 
 
-# load and preprocess data
-df = pd.read_csv("../data/processed/serbian_apartments_clean.csv", encoding="utf-8-sig", on_bad_lines="skip")
-prep = ApartmentPreprocessor()
-df_model = prep.fit_transform(df, scale=True)
-df_model.to_csv("../data/processed/data_numeric_scaled.csv", index=False, encoding="utf-8-sig")
+def encode_dataset(csv_in=CLEAN_CSV, csv_out=ENCODED_CSV, fmt=None):
+    # load and preprocess data, then save the model-ready features; returns them and the path written
+    df = read_table(csv_in, columns=ApartmentPreprocessor.INPUT_COLUMNS)
+    df_model = ApartmentPreprocessor().fit_transform(df, scale=True)
+    path = write_table(df_model, csv_out, fmt, typed=False)
+    return df_model, path
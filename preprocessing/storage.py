@@ -0,0 +1,167 @@
+import os
+import warnings
+
+import numpy as np
+import pandas as pd
+
+from scripts.instrumentation import span
+
+# low-cardinality text columns stored as categoricals
+CATEGORICAL_COLUMNS = ["City", "Municipality", "Neighbourhood", "Type", "Condition", "Heating"]
+# numeric columns stored as float32 (prices and areas don't need more precision)
+FLOAT_COLUMNS = ["Price", "Area_m2", "Rooms", "Price_per_m2"]
+INT_COLUMNS = ["Parking_garage", "Parking_outdoor"]
+
+FORMATS = {".parquet": "parquet", ".feather": "feather", ".csv": "csv"}
+DEFAULT_FORMAT = "parquet"
+
+
+def has_pyarrow():
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def with_format(path, fmt):
+    return os.path.splitext(path)[0] + "." + fmt
+
+
+def resolve(path):
+    # the same dataset may exist as .parquet, .feather and .csv; use the most recently written one
+    candidates = [with_format(path, fmt) for fmt in FORMATS.values()]
+    existing = [p for p in candidates if os.path.exists(p)]
+    if not existing:
+        return path
+    return max(existing, key=os.path.getmtime)
+
+
+def optimize_dtypes(df: pd.DataFrame) -> pd.DataFrame:
+    # categorical text and compact numerics; string columns that aren't numeric are left alone
+    for col in df.columns.intersection(CATEGORICAL_COLUMNS):
+        if not isinstance(df[col].dtype, pd.CategoricalDtype):
+            df[col] = df[col].astype("category")
+    for col in df.columns.intersection(FLOAT_COLUMNS):
+        if pd.api.types.is_numeric_dtype(df[col]):
+            df[col] = df[col].astype(np.float32)
+    for col in df.columns.intersection(INT_COLUMNS):
+        if pd.api.types.is_numeric_dtype(df[col]) and not df[col].isna().any():
+            df[col] = df[col].astype(np.int8)
+    return df
+
+
+def read_table(path, columns=None, typed=True, memory_map=True) -> pd.DataFrame:
+    # single entry point for every loader; reads only `columns` when given
+    path = resolve(path)
+    fmt = FORMATS.get(os.path.splitext(path)[1], "csv")
+    with span("read_table", path=os.path.basename(path), bytes=os.path.getsize(path)) as s:
+        if fmt == "parquet":
+            import pyarrow.parquet as pq
+            df = pq.read_table(path, columns=columns, memory_map=memory_map).to_pandas()
+        elif fmt == "feather":
+            import pyarrow.feather as feather
+            df = feather.read_table(path, columns=columns, memory_map=memory_map).to_pandas()
+        else:
+            df = pd.read_csv(path, usecols=columns, encoding="utf-8-sig", on_bad_lines="skip")
+        df = optimize_dtypes(df) if typed else df
+        s.set(rows=len(df))
+    return df
+
+
+def iter_table(path, chunksize=100_000, columns=None, typed=True):
+    # stream a table in chunks of at most `chunksize` rows, each read timed as its own span
+    path = resolve(path)
+    chunks = _read_chunks(path, chunksize, columns)
+    while True:
+        with span("read_chunk", path=os.path.basename(path)) as s:
+            df = next(chunks, None)
+            if df is not None:
+                df = optimize_dtypes(df) if typed else df
+                s.set(rows=len(df))
+        if df is None:
+            return
+        yield df
+
+
+def _read_chunks(path, chunksize, columns):
+    # untyped chunks straight from the file; nothing is read until the next chunk is asked for
+    fmt = FORMATS.get(os.path.splitext(path)[1], "csv")
+    if fmt == "parquet":
+        import pyarrow.parquet as pq
+        for batch in pq.ParquetFile(path, memory_map=True).iter_batches(batch_size=chunksize, columns=columns):
+            yield batch.to_pandas()
+    elif fmt == "feather":
+        import pyarrow.feather as feather
+        table = feather.read_table(path, columns=columns, memory_map=True)
+        for batch in table.to_batches(max_chunksize=chunksize):
+            yield batch.to_pandas()
+    else:
+        yield from pd.read_csv(path, usecols=columns, encoding="utf-8-sig", on_bad_lines="skip",
+                               chunksize=chunksize)
+
+
+def write_table(df: pd.DataFrame, path, fmt=None, typed=True):
+    # write `df` next to `path` in the requested format; returns the path written
+    fmt = fmt or DEFAULT_FORMAT
+    if fmt != "csv" and not has_pyarrow():
+        warnings.warn(f"pyarrow is not installed, writing CSV instead of {fmt}")
+        fmt = "csv"
+    path = with_format(path, fmt)
+    with span("write_table", path=os.path.basename(path), rows=len(df)) as s:
+        if typed:
+            df = optimize_dtypes(df.copy())
+        if fmt == "parquet":
+            df.to_parquet(path, index=False)
+        elif fmt == "feather":
+            df.reset_index(drop=True).to_feather(path)
+        else:
+            df.to_csv(path, index=False, encoding="utf-8-sig")
+        s.set(bytes=os.path.getsize(path))
+    return path
+
+
+class TableWriter:
+    # append chunks to one output file without holding them all in memory
+    def __init__(self, path, fmt=None):
+        fmt = fmt or FORMATS.get(os.path.splitext(path)[1], DEFAULT_FORMAT)
+        if fmt != "csv" and not has_pyarrow():
+            warnings.warn(f"pyarrow is not installed, writing CSV instead of {fmt}")
+            fmt = "csv"
+        self.fmt = fmt
+        self.path = with_format(path, fmt)
+        self.rows = 0
+        self._writer = None
+        self._schema = None
+
+    def write(self, df: pd.DataFrame):
+        if self.fmt == "csv":
+            # only the first chunk gets the header (and the BOM)
+            df.to_csv(self.path, mode="a" if self.rows else "w", header=not self.rows, index=False,
+                      encoding="utf-8" if self.rows else "utf-8-sig")
+        else:
+            import pyarrow as pa
+            table = pa.Table.from_pandas(df, preserve_index=False)
+            if self._writer is None:
+                self._schema = table.schema
+                if self.fmt == "parquet":
+                    import pyarrow.parquet as pq
+                    self._writer = pq.ParquetWriter(self.path, self._schema)
+                else:
+                    self._writer = pa.ipc.new_file(self.path, self._schema)
+            else:
+                # a chunk where a column happens to be all-null infers a different type
+                table = table.cast(self._schema)
+            self._writer.write_table(table)
+        self.rows += len(df)
+
+    def close(self):
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,96 @@
+import copy
+
+import numpy as np
+import pandas as pd
+from sklearn.model_selection import KFold
+
+
+class TargetEncoder:
+    # Smoothed mean target per key, from running count/sum statistics.
+    # `columns` is a hierarchy, e.g. ("Municipality", "Neighbourhood"): each level is shrunk toward
+    # its parent's encoding and the first level toward the overall mean. Unseen keys get the parent value.
+    def __init__(self, columns=("Municipality",), target="Price", smoothing=20.0):
+        self.columns = tuple(columns)
+        self.target = target
+        self.smoothing = smoothing
+        self.count = 0
+        self.total = 0.0
+        # one {key: [count, sum]} dict per level; deeper levels are keyed by tuples
+        self.stats = [{} for _ in self.columns]
+
+    def _keys(self, df, depth):
+        # codes and distinct keys for one level; missing values count as "Ostalo", like the cleaned data
+        cols = [df[col].astype(object).fillna("Ostalo") for col in self.columns[:depth + 1]]
+        if depth == 0:
+            codes, uniques = pd.factorize(cols[0])
+        else:
+            codes, uniques = pd.MultiIndex.from_arrays(cols).factorize()
+        return codes, list(uniques)
+
+    def _accumulate(self, df, sign):
+        y = pd.to_numeric(df[self.target], errors="coerce").to_numpy(dtype=np.float64)
+        valid = ~np.isnan(y)
+        df, y = df[valid], y[valid]
+        self.count += sign * len(y)
+        self.total += sign * y.sum()
+        for depth, stats in enumerate(self.stats):
+            codes, uniques = self._keys(df, depth)
+            counts = np.bincount(codes, minlength=len(uniques))
+            sums = np.bincount(codes, weights=y, minlength=len(uniques))
+            for key, c, s in zip(uniques, counts, sums):
+                entry = stats.setdefault(key, [0, 0.0])
+                entry[0] += sign * int(c)
+                entry[1] += sign * s
+        return self
+
+    def partial_fit(self, df: pd.DataFrame):
+        # add new listings; cost grows with the new rows only
+        return self._accumulate(df, +1)
+
+    def fit(self, df: pd.DataFrame):
+        self.count, self.total = 0, 0.0
+        self.stats = [{} for _ in self.columns]
+        return self.partial_fit(df)
+
+    @property
+    def global_mean(self):
+        return self.total / self.count if self.count else np.nan
+
+    def transform(self, df: pd.DataFrame) -> np.ndarray:
+        # one column of smoothed encodings per level
+        out = np.empty((len(df), len(self.columns)))
+        prior = np.full(len(df), self.global_mean)
+        for depth, stats in enumerate(self.stats):
+            codes, uniques = self._keys(df, depth)
+            lut = np.array([stats.get(key, (0, 0.0)) for key in uniques] + [(0, 0.0)],
+                           dtype=np.float64).reshape(-1, 2)
+            count, total = lut[codes, 0], lut[codes, 1]
+            prior = (total + self.smoothing * prior) / (count + self.smoothing)
+            out[:, depth] = prior
+        return out
+
+    def transform_one(self, row: dict) -> float:
+        # deepest-level encoding of a single record, without building a frame
+        prior = self.global_mean
+        key = ()
+        for col, stats in zip(self.columns, self.stats):
+            value = row.get(col)
+            key += ("Ostalo" if pd.isna(value) else value,)
+            count, total = stats.get(key[0] if len(key) == 1 else key, (0, 0.0))
+            prior = (total + self.smoothing * prior) / (count + self.smoothing)
+        return prior
+
+    def fit_transform_oof(self, df: pd.DataFrame, n_splits=5, random_state=42) -> np.ndarray:
+        # fit on all rows, and encode each row with statistics from the other folds only,
+        # so training rows never see their own target
+        self.fit(df)
+        if len(df) < 2:
+            # no other rows to encode from: the smoothed prior, i.e. the plain in-sample encoding
+            return self.transform(df)
+        out = np.empty((len(df), len(self.columns)))
+        # fewer folds than the default on tiny frames, KFold needs at least one row per fold
+        folds = KFold(min(n_splits, len(df)), shuffle=True, random_state=random_state)
+        for _, fold_idx in folds.split(df):
+            fold = df.iloc[fold_idx]
+            out[fold_idx] = copy.deepcopy(self)._accumulate(fold, -1).transform(fold)
+        return out
@@ -0,0 +1,80 @@
+import asyncio
+import random
+import time
+
+import aiohttp
+
+from scripts.instrumentation import count
+
+# statuses worth retrying: rate limiting and transient server errors
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+class TokenBucket:
+    # on average `rate` requests per second, with bursts of up to `capacity`
+    def __init__(self, rate, capacity=None):
+        self.rate = rate
+        self.capacity = capacity or max(1.0, rate)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+
+class AsyncFetcher:
+    # pooled HTTP client with a concurrency limit, rate limit and retry with backoff
+    def __init__(self, concurrency=8, rate=4.0, burst=None, retries=3, backoff=1.0, timeout=20,
+                 headers=None):
+        self.concurrency = concurrency
+        self.bucket = TokenBucket(rate, burst)
+        self.retries = retries
+        self.backoff = backoff
+        self.timeout = aiohttp.ClientTimeout(total=timeout)
+        self.headers = headers or {"User-Agent": "Mozilla/5.0"}
+        self.session = None
+        self._semaphore = asyncio.Semaphore(concurrency)
+
+    async def __aenter__(self):
+        connector = aiohttp.TCPConnector(limit=self.concurrency, limit_per_host=self.concurrency)
+        self.session = aiohttp.ClientSession(connector=connector, timeout=self.timeout, headers=self.headers)
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.session.close()
+
+    async def fetch(self, url):
+        # page text, or None when the page does not exist
+        for attempt in range(self.retries + 1):
+            await self.bucket.acquire()
+            try:
+                async with self._semaphore:
+                    count("http.requests")
+                    async with self.session.get(url) as resp:
+                        if resp.status == 404:
+                            return None
+                        if resp.status in RETRY_STATUSES:
+                            raise aiohttp.ClientResponseError(resp.request_info, resp.history,
+                                                              status=resp.status)
+                        resp.raise_for_status()
+                        text = await resp.text(encoding="utf-8")
+                        count("http.bytes", len(text))
+                        return text
+            except aiohttp.ClientResponseError as e:
+                # other 4xx/5xx answers won't change on a retry
+                if e.status not in RETRY_STATUSES or attempt == self.retries:
+                    raise
+            except (aiohttp.ClientError, asyncio.TimeoutError):
+                if attempt == self.retries:
+                    raise
+            # exponential backoff with jitter so retries don't arrive in lockstep
+            await asyncio.sleep(self.backoff * 2 ** attempt * (1 + random.random()))
@@ -0,0 +1,62 @@
+# Local HTTP stub that serves saved HTML pages, so the scrapers can run without hitting the site.
+# Listing pages: ?page=N -> <fixtures>/listings/page_N.html (404 past the last saved page).
+# Any other path: <fixtures>/<last path segment>.html, e.g. detail pages saved by listing ID.
+#   python -m scripts.fixture_server --port 8000
+#   python -m scripts.scrape_basic --base-url http://127.0.0.1:8000 --output /tmp/basic.csv
+import argparse
+import functools
+import os
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "benchmarks", "fixtures")
+
+
+class FixtureHandler(BaseHTTPRequestHandler):
+    def __init__(self, *args, fixtures_dir=FIXTURES_DIR, **kwargs):
+        self.fixtures_dir = fixtures_dir
+        super().__init__(*args, **kwargs)
+
+    def _fixture_path(self):
+        url = urlparse(self.path)
+        page = parse_qs(url.query).get("page")
+        if page:
+            return os.path.join(self.fixtures_dir, "listings", f"page_{int(page[0])}.html")
+        name = url.path.rstrip("/").rsplit("/", 1)[-1] or "index"
+        return os.path.join(self.fixtures_dir, f"{name}.html")
+
+    def do_GET(self):
+        path = self._fixture_path()
+        if not os.path.isfile(path):
+            self.send_error(404)
+            return
+        with open(path, "rb") as f:
+            body = f.read()
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def serve(port=8000, fixtures_dir=FIXTURES_DIR):
+    handler = functools.partial(FixtureHandler, fixtures_dir=fixtures_dir)
+    return ThreadingHTTPServer(("127.0.0.1", port), handler)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve saved HTML fixtures")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--fixtures", default=FIXTURES_DIR)
+    args = parser.parse_args(argv)
+
+    server = serve(args.port, args.fixtures)
+    print(f"Serving {args.fixtures} on http://127.0.0.1:{args.port}")
+    server.serve_forever()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,189 @@
+# Opt-in timing spans, counters and memory peaks, exported as a Chrome trace
+# (open in chrome://tracing or https://ui.perfetto.dev).
+#   APARTMENTS_TRACE=trace.json python main.py train      # or =1 for ./trace.json
+#   APARTMENTS_TRACE_MEMORY=1 ...                         # also peak traced memory per span (slower)
+# The switch is read once at import: when it is off, @traced returns the function unchanged and
+# span() hands back one shared no-op object, so instrumented code pays a function call at most.
+import atexit
+import functools
+import json
+import os
+import sys
+import threading
+import time
+import tracemalloc
+
+TRACE_ENV = "APARTMENTS_TRACE"
+MEMORY_ENV = "APARTMENTS_TRACE_MEMORY"
+# set by the first traced process, so worker processes write their own file next to it
+PARENT_ENV = "APARTMENTS_TRACE_PARENT"
+
+ENABLED = os.environ.get(TRACE_ENV, "") not in ("", "0")
+MEMORY = ENABLED and os.environ.get(MEMORY_ENV, "") not in ("", "0")
+
+_events = []
+_totals = {}
+_t0 = time.perf_counter()
+_local = threading.local()
+# spans and counters can be recorded from several threads at once
+_lock = threading.Lock()
+
+
+def _now_us():
+    return (time.perf_counter() - _t0) * 1e6
+
+
+class _NullSpan:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def set(self, **args):
+        pass
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class Span:
+    # one complete ("X") trace event; rows/bytes given through set() become rows/s and MB/s
+    def __init__(self, name, args):
+        self.name = name
+        self.args = args
+        self.peak = 0
+
+    def set(self, **args):
+        self.args.update(args)
+
+    def __enter__(self):
+        if MEMORY:
+            stack = _memory_stack()
+            if stack:
+                stack[-1].peak = max(stack[-1].peak, tracemalloc.get_traced_memory()[1])
+            tracemalloc.reset_peak()
+            stack.append(self)
+        self.start = _now_us()
+        return self
+
+    def __exit__(self, *exc):
+        duration = _now_us() - self.start
+        seconds = duration / 1e6
+        args = self.args
+        if seconds > 0 and "rows" in args:
+            args["rows_per_s"] = round(args["rows"] / seconds)
+        if seconds > 0 and "bytes" in args:
+            args["mb_per_s"] = round(args["bytes"] / seconds / 1e6, 2)
+        if MEMORY:
+            stack = _memory_stack()
+            stack.pop()
+            self.peak = max(self.peak, tracemalloc.get_traced_memory()[1])
+            args["peak_mb"] = round(self.peak / 1e6, 2)
+            if stack:
+                stack[-1].peak = max(stack[-1].peak, self.peak)
+            tracemalloc.reset_peak()
+        with _lock:
+            _events.append({"name": self.name, "ph": "X", "ts": self.start, "dur": duration,
+                            "pid": os.getpid(), "tid": threading.get_ident(), "args": args})
+            total = _totals.setdefault(self.name, [0, 0.0])
+            total[0] += 1
+            total[1] += seconds
+        return False
+
+
+def _memory_stack():
+    if not hasattr(_local, "stack"):
+        _local.stack = []
+    return _local.stack
+
+
+def span(name, **args):
+    # with span("stage", rows=n) as s: ...; s.set(bytes=...)
+    if not ENABLED:
+        return _NULL_SPAN
+    return Span(name, args)
+
+
+def traced(name=None):
+    # decorator version of span(); a no-op when tracing is off
+    def decorate(fn):
+        if not ENABLED:
+            return fn
+        label = name or fn.__qualname__
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with Span(label, {}):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+def count(name, value=1):
+    # running counter ("C" event), e.g. HTTP requests or bytes downloaded
+    if not ENABLED:
+        return
+    with _lock:
+        totals = _totals.setdefault(f"#{name}", [0, 0.0])
+        totals[0] += value
+        _events.append({"name": name, "ph": "C", "ts": _now_us(), "pid": os.getpid(),
+                        "args": {name: totals[0]}})
+
+
+def _is_child():
+    return os.environ.get(PARENT_ENV, str(os.getpid())) != str(os.getpid())
+
+
+def trace_path():
+    value = os.environ.get(TRACE_ENV, "")
+    path = "trace.json" if value in ("1", "true", "yes") else value
+    if _is_child():
+        root, ext = os.path.splitext(path)
+        path = f"{root}.{os.getpid()}{ext or '.json'}"
+    return path
+
+
+def write_trace(path=None):
+    # Chrome trace JSON plus a per-span summary on stderr
+    path = path or trace_path()
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"traceEvents": _events, "displayTimeUnit": "ms"}, f)
+
+    if _is_child():
+        return
+    spans = sorted(((n, c, s) for n, (c, s) in _totals.items() if not n.startswith("#")),
+                   key=lambda item: -item[2])
+    print(f"\ntrace written to {path}", file=sys.stderr)
+    print(f"{'span':<48}{'calls':>8}{'total s':>10}{'mean ms':>10}", file=sys.stderr)
+    for name, calls, seconds in spans:
+        print(f"{name:<48}{calls:>8}{seconds:>10.3f}{seconds / calls * 1000:>10.3f}", file=sys.stderr)
+    for name, (value, _) in _totals.items():
+        if name.startswith("#"):
+            print(f"{name[1:]:<48}{value:>8}", file=sys.stderr)
+
+
+def _register_writer():
+    if _is_child():
+        # pool workers leave through os._exit, which skips atexit but runs multiprocessing finalizers
+        from multiprocessing import util
+        util.Finalize(None, write_trace, exitpriority=0)
+    else:
+        atexit.register(write_trace)
+
+
+def _after_fork():
+    # a forked worker starts with an empty trace of its own, and a lock no other thread can be holding
+    global _lock
+    _lock = threading.Lock()
+    _events.clear()
+    _totals.clear()
+    _register_writer()
+
+
+if ENABLED:
+    os.environ.setdefault(PARENT_ENV, str(os.getpid()))
+    if MEMORY:
+        tracemalloc.start()
+    _register_writer()
+    os.register_at_fork(after_in_child=_after_fork)
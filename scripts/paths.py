@@ -0,0 +1,17 @@
+import os
+
+# every data location in one place, absolute so scripts work from any working directory
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DATA_DIR = os.path.join(ROOT, "data")
+RAW_DIR = os.path.join(DATA_DIR, "raw")
+PROCESSED_DIR = os.path.join(DATA_DIR, "processed")
+
+BASIC_CSV = os.path.join(RAW_DIR, "serbian_apartments_basic.csv")
+DETAILS_CSV = os.path.join(RAW_DIR, "serbian_apartments_details.csv")
+INDEX_DB = os.path.join(RAW_DIR, "scrape_index.sqlite")
+# cleaned scrape batches, combined into CLEAN_CSV
+BATCHES_DIR = os.path.join(PROCESSED_DIR, "batches")
+CLEAN_CSV = os.path.join(PROCESSED_DIR, "serbian_apartments_clean.csv")
+ENCODED_CSV = os.path.join(PROCESSED_DIR, "data_numeric_scaled.csv")
+# stage fingerprints from the last pipeline run
+PIPELINE_STATE = os.path.join(DATA_DIR, "pipeline_state.json")
@@ -0,0 +1,264 @@
+# Stage runner for scrape -> clean -> combine -> encode/train.
+# Each stage declares its input and output files; its fingerprint hashes the input contents, its
+# parameters and the source of the modules implementing it. A stage whose fingerprint matches the
+# last run and whose outputs are untouched is skipped. Stages run on a process pool as soon as the
+# stages producing their inputs finish, so scrape batches are cleaned in parallel, and encoding and
+# training run side by side.
+#   python main.py pipeline                       # clean, combine, encode, train what changed
+#   python main.py pipeline --scrape              # fetch new listings first
+#   python main.py pipeline --alpha 3             # retrains only
+import glob
+import hashlib
+import importlib.util
+import json
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+from scripts import paths
+
+
+class Stage:
+    def __init__(self, name, fn, inputs=(), outputs=(), params=None, code=(), always=False):
+        # fn(**params) runs in a worker process and returns the paths it wrote
+        self.name = name
+        self.fn = fn
+        self.inputs = list(inputs)
+        self.outputs = list(outputs)
+        self.params = params or {}
+        # modules doing the actual work; editing one of them re-runs the stage
+        self.code = [fn.__module__, *code]
+        # stages reading something we can't fingerprint (the website) run every time they're selected
+        self.always = always
+
+
+class FileHashes:
+    # sha256 of file contents, cached by (mtime, size) so unchanged files aren't re-read
+    def __init__(self, cache=None):
+        self.cache = cache or {}
+
+    def __call__(self, path):
+        from preprocessing.storage import resolve
+
+        path = os.path.abspath(resolve(path))
+        if not os.path.exists(path):
+            return None
+        stat = os.stat(path)
+        cached = self.cache.get(path)
+        if cached and cached[:2] == [stat.st_mtime_ns, stat.st_size]:
+            return cached[2]
+        h = hashlib.sha256()
+        with open(path, "rb") as f:
+            for block in iter(lambda: f.read(1 << 20), b""):
+                h.update(block)
+        self.cache[path] = [stat.st_mtime_ns, stat.st_size, h.hexdigest()]
+        return h.hexdigest()
+
+
+def _source_hash(modules):
+    # located without importing, so fingerprinting stays cheap
+    h = hashlib.sha256()
+    for module in sorted(modules):
+        with open(importlib.util.find_spec(module).origin, "rb") as f:
+            h.update(f.read())
+    return h.hexdigest()
+
+
+def fingerprint(stage, file_hash):
+    h = hashlib.sha256()
+    h.update(json.dumps({"fn": f"{stage.fn.__module__}.{stage.fn.__qualname__}", "params": stage.params},
+                        sort_keys=True, default=str).encode("utf-8"))
+    h.update(_source_hash(stage.code).encode("utf-8"))
+    for path in sorted(stage.inputs):
+        h.update(f"{path}:{file_hash(path)}".encode("utf-8"))
+    return h.hexdigest()
+
+
+class Pipeline:
+    def __init__(self, stages, state_path=paths.PIPELINE_STATE, workers=None):
+        self.stages = {stage.name: stage for stage in stages}
+        self.state_path = state_path
+        self.workers = workers
+        # a stage depends on every stage that declares one of its inputs as an output
+        produced_by = {path: stage.name for stage in stages for path in stage.outputs}
+        self.deps = {stage.name: {produced_by[path] for path in stage.inputs if path in produced_by}
+                     for stage in stages}
+
+    def _load_state(self):
+        try:
+            with open(self.state_path, encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {"stages": {}, "hashes": {}}
+
+    def _save_state(self, state):
+        os.makedirs(os.path.dirname(self.state_path), exist_ok=True)
+        tmp_path = self.state_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(state, f, indent=1)
+        os.replace(tmp_path, self.state_path)
+
+    def _up_to_date(self, stage, key, state, file_hash):
+        previous = state["stages"].get(stage.name)
+        if stage.always or previous is None or previous["fingerprint"] != key:
+            return False
+        # outputs deleted or edited since the last run count as stale
+        return all(file_hash(path) == digest for path, digest in previous["outputs"].items())
+
+    def run(self, force=False):
+        # returns [(stage, "ran" | "skipped", seconds)] in completion order
+        state = self._load_state()
+        file_hash = FileHashes(state["hashes"])
+        done, started, running, timings = set(), set(), {}, []
+        t_start = time.perf_counter()
+
+        with ProcessPoolExecutor(max_workers=self.workers) as pool:
+            while len(done) < len(self.stages):
+                for name, stage in self.stages.items():
+                    if name in done or name in started or not self.deps[name] <= done:
+                        continue
+                    key = fingerprint(stage, file_hash)
+                    if not force and self._up_to_date(stage, key, state, file_hash):
+                        done.add(name)
+                        timings.append((name, "skipped", 0.0))
+                        print(f"  {name:<32} skipped (unchanged)")
+                        continue
+                    print(f"  {name:<32} started")
+                    started.add(name)
+                    running[pool.submit(_timed, stage.fn, stage.params)] = (name, key)
+
+                if not running:
+                    continue
+                finished, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    name, key = running.pop(future)
+                    written, seconds = future.result()
+                    state["stages"][name] = {
+                        "fingerprint": key,
+                        "outputs": {path: file_hash(path) for path in written},
+                        "seconds": seconds,
+                    }
+                    # saved after every stage, so an interrupted run keeps its finished work
+                    self._save_state(state)
+                    done.add(name)
+                    timings.append((name, "ran", seconds))
+                    print(f"  {name:<32} done in {seconds:.2f}s")
+
+        print(f"pipeline finished in {time.perf_counter() - t_start:.2f}s")
+        return timings
+
+
+def _timed(fn, params):
+    t0 = time.perf_counter()
+    written = fn(**params)
+    return [os.path.abspath(path) for path in written], time.perf_counter() - t0
+
+
+# stage implementations, module level so the process pool can pickle them
+
+def scrape_basic(output, index):
+    from scripts.scrape_basic import main
+
+    main(["--output", output, "--index", index, "--format", "csv"])
+    return [output]
+
+
+def scrape_details(basic, output, index):
+    from scripts.scrape_details import main
+
+    main(["--input", basic, "--output", output, "--index", index, "--format", "csv"])
+    return [output]
+
+
+def clean_batch(basic, details, output):
+    from preprocessing.data_cleaning import clean
+    from preprocessing.storage import read_table, write_table
+
+    df, _ = clean(read_table(basic, typed=False), read_table(details))
+    os.makedirs(os.path.dirname(output), exist_ok=True)
+    return [write_table(df, output)]
+
+
+def combine(batches, output):
+    # batches in name order; a listing cleaned in several batches keeps its latest row
+    import pandas as pd
+    from preprocessing.storage import read_table, write_table
+
+    df = pd.concat([read_table(path, typed=False) for path in batches], ignore_index=True)
+    has_id = df["Listing_ID"].notna()
+    df = df[~(has_id & df.duplicated("Listing_ID", keep="last"))].reset_index(drop=True)
+    return [write_table(df, output)]
+
+
+def encode(source, output):
+    from preprocessing.numeric_encoding import encode_dataset
+
+    _, path = encode_dataset(source, output)
+    return [path]
+
+
+def train(source, model_cls, params):
+    from models.registry import ModelRegistry
+
+    registry = ModelRegistry()
+    registry.get(model_cls, source, **params)
+    return [registry.artifact_path(model_cls, registry.fingerprint(model_cls, source, **params))]
+
+
+def scrape_batches(raw_dir=paths.RAW_DIR):
+    # (name, basic, details) for every serbian_apartments_basic<suffix> with a details table alongside,
+    # e.g. serbian_apartments_basic_2026-10.parquet + serbian_apartments_details_2026-10.parquet
+    batches = {}
+    for path in glob.glob(os.path.join(raw_dir, "serbian_apartments_basic*.*")):
+        stem = os.path.splitext(os.path.basename(path))[0]
+        suffix = stem[len("serbian_apartments_basic"):]
+        details = os.path.join(raw_dir, f"serbian_apartments_details{suffix}.csv")
+        if suffix not in batches and glob.glob(os.path.splitext(details)[0] + ".*"):
+            batches[suffix] = (suffix.strip("_-") or "main", os.path.join(raw_dir, stem + ".csv"), details)
+    return [batches[suffix] for suffix in sorted(batches)]
+
+
+def build_stages(model_cls, model_params, scrape=False):
+    stages = []
+    if scrape:
+        stages.append(Stage("scrape_basic", scrape_basic, outputs=[paths.BASIC_CSV],
+                            params={"output": paths.BASIC_CSV, "index": paths.INDEX_DB}, always=True))
+        stages.append(Stage("scrape_details", scrape_details, inputs=[paths.BASIC_CSV], outputs=[paths.DETAILS_CSV],
+                            params={"basic": paths.BASIC_CSV, "output": paths.DETAILS_CSV, "index": paths.INDEX_DB},
+                            always=True))
+
+    batches = scrape_batches()
+    if scrape and not any(name == "main" for name, _, _ in batches):
+        batches.insert(0, ("main", paths.BASIC_CSV, paths.DETAILS_CSV))
+    if not batches:
+        raise ValueError(f"no scraped tables in {paths.RAW_DIR}, run with scrape=True first")
+
+    cleaned = []
+    for name, basic, details in batches:
+        output = os.path.join(paths.BATCHES_DIR, f"{name}.parquet")
+        cleaned.append(output)
+        stages.append(Stage(f"clean[{name}]", clean_batch, inputs=[basic, details], outputs=[output],
+                            params={"basic": basic, "details": details, "output": output},
+                            code=["preprocessing.data_cleaning", "preprocessing.storage"]))
+
+    stages.append(Stage("combine", combine, inputs=cleaned, outputs=[paths.CLEAN_CSV],
+                        params={"batches": cleaned, "output": paths.CLEAN_CSV}))
+    stages.append(Stage("encode", encode, inputs=[paths.CLEAN_CSV], outputs=[paths.ENCODED_CSV],
+                        params={"source": paths.CLEAN_CSV, "output": paths.ENCODED_CSV},
+                        code=["preprocessing.numeric_encoding", "preprocessing.target_encoding"]))
+    stages.append(Stage(f"train[{model_cls.__name__}]", train, inputs=[paths.CLEAN_CSV],
+                        params={"source": paths.CLEAN_CSV, "model_cls": model_cls, "params": model_params},
+                        code=[model_cls.__module__, "preprocessing.numeric_encoding",
+                              "preprocessing.target_encoding", "models.registry"]))
+
+    # the interval model the GUI loads, unless the stage above already is that model
+    from models.polynomial_regression import PolynomialRegressionModel
+    from models.registry import INTERVAL_MODEL_PARAMS
+
+    if (model_cls, model_params) != (PolynomialRegressionModel, INTERVAL_MODEL_PARAMS):
+        stages.append(Stage("train[gui]", train, inputs=[paths.CLEAN_CSV],
+                            params={"source": paths.CLEAN_CSV, "model_cls": PolynomialRegressionModel,
+                                    "params": INTERVAL_MODEL_PARAMS},
+                            code=["models.polynomial_regression", "models.bootstrap", "preprocessing.numeric_encoding",
+                                  "preprocessing.target_encoding", "models.registry"]))
+    return stages
@@ -0,0 +1,160 @@
+# Async HTTP price service around a fitted model, loaded once at startup.
+# POST /predict takes one apartment or a list of them, in the dict shape the GUI's _collect_apartment
+# builds, and answers in the same shape. Requests arriving within a few milliseconds of each other
+# are coalesced into one vectorized predict_batch call.
+#   python main.py serve --port 8080
+#   curl -d '{"Municipality": "Zvezdara", "Area_m2": 65, "Rooms": 3, "Floor": "II/5", "Type": "Stara gradnja",
+#             "Condition": "Renovirano", "Heating": "CG", "Parking_garage": 0, "Parking_outdoor": 1}' \
+#        http://127.0.0.1:8080/predict
+import asyncio
+import time
+
+import numpy as np
+import pandas as pd
+from aiohttp import web
+
+# fields predict_batch reads; Price is only used for fitting
+REQUIRED_FIELDS = ["Municipality", "Area_m2", "Rooms", "Floor", "Type", "Condition", "Heating",
+                   "Parking_garage", "Parking_outdoor"]
+
+
+class MicroBatcher:
+    # queue requests for up to `max_wait_ms` after the first one arrives (or until `max_batch` rows),
+    # then predict them all with one call on a worker thread, so the event loop keeps accepting requests
+    def __init__(self, model, max_wait_ms=5.0, max_batch=4096, interval=None):
+        self.model = model
+        self.max_wait = max_wait_ms / 1000
+        self.max_batch = max_batch
+        self.interval = interval
+        self.batches = 0
+        self.rows = 0
+        self._queue = asyncio.Queue()
+        self._task = None
+
+    def start(self):
+        self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self):
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+
+    async def predict(self, records):
+        # list of result dicts, one per record
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((records, future))
+        return await future
+
+    async def _collect(self):
+        pending = [await self._queue.get()]
+        rows = len(pending[0][0])
+        deadline = time.monotonic() + self.max_wait
+        while rows < self.max_batch:
+            timeout = deadline - time.monotonic()
+            try:
+                item = self._queue.get_nowait() if timeout <= 0 else \
+                    await asyncio.wait_for(self._queue.get(), timeout)
+            except (asyncio.QueueEmpty, asyncio.TimeoutError):
+                break
+            pending.append(item)
+            rows += len(item[0])
+        return pending
+
+    def _predict(self, records):
+        options = {"interval": self.interval} if self.interval else {}
+        result = self.model.predict_batch(pd.DataFrame.from_records(records), **options)
+        # JSON has no NaN or Infinity: rows the model can't price answer null instead
+        result = result.round(2).replace([np.inf, -np.inf], np.nan)
+        return result.astype(object).where(result.notna(), None).to_dict(orient="records")
+
+    async def _answer(self, pending):
+        records = [record for batch, _ in pending for record in batch]
+        rows = await asyncio.get_running_loop().run_in_executor(None, self._predict, records)
+        self.batches += 1
+        self.rows += len(records)
+        start = 0
+        for batch, future in pending:
+            if not future.done():
+                future.set_result(rows[start:start + len(batch)])
+            start += len(batch)
+
+    async def _run(self):
+        while True:
+            pending = await self._collect()
+            try:
+                await self._answer(pending)
+            except Exception as exc:
+                if len(pending) == 1:
+                    if not pending[0][1].done():
+                        pending[0][1].set_exception(exc)
+                    continue
+                # one bad request shouldn't fail the others coalesced with it: retry them one by one
+                for item in pending:
+                    try:
+                        await self._answer([item])
+                    except Exception as item_exc:
+                        if not item[1].done():
+                            item[1].set_exception(item_exc)
+
+
+def _validate(payload):
+    # list of apartment dicts, or an error message
+    records = payload if isinstance(payload, list) else [payload]
+    for i, record in enumerate(records):
+        if not isinstance(record, dict):
+            return None, f"item {i} is not an object"
+        missing = [field for field in REQUIRED_FIELDS if field not in record]
+        if missing:
+            return None, f"item {i} is missing {', '.join(missing)}"
+    return records, None
+
+
+async def handle_predict(request):
+    try:
+        payload = await request.json()
+    except ValueError:
+        return web.json_response({"error": "body must be JSON"}, status=400)
+    records, error = _validate(payload)
+    if error:
+        return web.json_response({"error": error}, status=400)
+    if not records:
+        return web.json_response([])
+
+    try:
+        results = await request.app["batcher"].predict(records)
+    except (ValueError, TypeError, KeyError) as exc:
+        return web.json_response({"error": f"{type(exc).__name__}: {exc}"}, status=400)
+    return web.json_response(results if isinstance(payload, list) else results[0])
+
+
+async def handle_health(request):
+    batcher = request.app["batcher"]
+    return web.json_response({
+        "model": type(batcher.model).__name__,
+        "batches": batcher.batches,
+        "rows": batcher.rows,
+    })
+
+
+def create_app(model, max_wait_ms=5.0, max_batch=4096, interval=None):
+    app = web.Application(client_max_size=64 * 1024 ** 2)
+    app["batcher"] = MicroBatcher(model, max_wait_ms, max_batch, interval)
+
+    async def on_startup(app):
+        app["batcher"].start()
+
+    async def on_cleanup(app):
+        await app["batcher"].stop()
+
+    app.on_startup.append(on_startup)
+    app.on_cleanup.append(on_cleanup)
+    app.router.add_post("/predict", handle_predict)
+    app.router.add_get("/health", handle_health)
+    return app
+
+
+def run(model, host="127.0.0.1", port=8080, max_wait_ms=5.0, max_batch=4096, interval=None):
+    print(f"Serving {type(model).__name__} on http://{host}:{port}/predict")
+    web.run_app(create_app(model, max_wait_ms, max_batch, interval), host=host, port=port, print=None)
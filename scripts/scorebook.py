@@ -8,6 +8,10 @@ CONDITION_MAP = {
     "Lux": 3
 }
 
+# Type and Heating values as the details scraper records them; one-hot encoded, so no scores
+TYPE_VALUES = ["Novogradnja", "Stara gradnja"]
+HEATING_VALUES = ["EG", "CG", "Norveški radijatori", "Podno", "Toplotne pumpe", "TA", "Gas"]
+
 # Roman numerals mapping
 ROMAN_MAP = {
     "I": 1, "II": 2, "III": 3, "IV": 4, "V": 5,
@@ -1,35 +1,49 @@
-import requests
+import argparse
+import asyncio
+import re
+from contextlib import aclosing
+
 from bs4 import BeautifulSoup
 import pandas as pd
-import random
-import time
-import re
 
-# number of apartments the model should target
-TOTAL_TARGET = 300
-data_list = []
+from scripts.fetcher import AsyncFetcher
+from scripts.instrumentation import traced
+from scripts.paths import BASIC_CSV
+from scripts.url_index import INDEX_DB, UrlIndex
+from preprocessing.storage import write_table
+
+BASE_URL = "https://www.halooglasi.com"
+LISTING_PATH = "/nekretnine/prodaja-stanova/beograd"
+OUTPUT_CSV = BASIC_CSV
+
+# stop after this many apartments; 0 collects every listing on the pages fetched
+TOTAL_TARGET = 0
+# optional cap on listing pages; None follows the pagination until the first empty page
+MAX_PAGES = None
+# pages failing this many times in a row (after the fetcher's retries) end the run, e.g. when blocked
+MAX_FAILED_PAGES = 5
+# listing pages fetched more recently than this are skipped when resuming
+PAGE_MAX_AGE = 12 * 3600
+COLUMNS = ["URL", "Title", "Price", "Location", "Details"]
 
-for page in range(1, 41):  # scrape up to 30 pages
-    url = "https://www.halooglasi.com/nekretnine/prodaja-stanova/beograd"
-    headers = {"User-Agent": "Mozilla/5.0"}
-    result = requests.get(url, headers=headers)
-    result.encoding = "utf-8"
-    soup = BeautifulSoup(result.text, "lxml")
-    ads = soup.find_all("div", class_="product-item")
 
-    if not ads:
-        break
+def page_url(base_url, page):
+    return f"{base_url}{LISTING_PATH}?page={page}"
 
-    sample_ads = random.sample(ads, min(5, len(ads)))
 
-    for ad in sample_ads:
+@traced()
+def parse_ads(html, base_url=BASE_URL):
+    # turn one listing page into [URL, Title, Price, Location, Details] rows
+    soup = BeautifulSoup(html, "lxml")
+    rows = []
+    for ad in soup.find_all("div", class_="product-item"):
         try:
             title_tag = ad.find("h3", class_="product-title")
             title = title_tag.get_text(strip=True)
             link = None
             link_tag = title_tag.find("a")
             if link_tag and "href" in link_tag.attrs:
-                link = "https://www.halooglasi.com" + link_tag["href"]
+                link = base_url + link_tag["href"]
             price = ad.find("div", class_="central-feature").get_text(strip=True)
             location = ad.find("ul", class_="subtitle-places").get_text(strip=True)
             location_formatted = re.sub(r'(?<!^)(?=[A-ZŠĆČŽĐ])', ', ', location)
@@ -40,16 +54,120 @@ for page in range(1, 41):  # scrape up to 30 pages
             else:
                 details = []
 
-            data_list.append([link, title, price, location_formatted, details])
+            rows.append([link, title, price, location_formatted, details])
 
         except AttributeError:
             continue
+    return rows
+
+
+async def iter_rows(fetcher, base_url=BASE_URL, max_pages=MAX_PAGES, skip_page=None, on_page=None):
+    # yield ad rows as soon as each page arrives; pages are fetched concurrently, in order, until the
+    # first empty page (or max_pages)
+    rows = asyncio.Queue()
+    next_page = 1
+    last_page = max_pages or float("inf")
+    failed = 0
+
+    async def worker():
+        nonlocal next_page, last_page, failed
+        while next_page <= last_page:
+            page = next_page
+            next_page += 1
+            url = page_url(base_url, page)
+            # pages already fetched as "ok" are fresh; empty ones never are, so the end is still found
+            if skip_page is not None and skip_page(url):
+                continue
+            try:
+                html = await fetcher.fetch(url)
+            except Exception as e:
+                print(f"Error fetching page {page}: {e}")
+                failed += 1
+                if failed >= MAX_FAILED_PAGES:
+                    last_page = min(last_page, page)
+                continue
+            failed = 0
+            ads = parse_ads(html, base_url) if html else []
+            # an empty page marks the end of the pagination
+            if not ads:
+                last_page = min(last_page, page)
+            if on_page is not None:
+                on_page(url, ads)
+            for row in ads:
+                await rows.put(row)
+
+    async def run_workers():
+        try:
+            await asyncio.gather(*(worker() for _ in range(fetcher.concurrency)))
+        finally:
+            await rows.put(None)
+
+    runner = asyncio.create_task(run_workers())
+    try:
+        while (row := await rows.get()) is not None:
+            yield row
+    finally:
+        runner.cancel()
+
+
+async def scrape(base_url=BASE_URL, max_pages=MAX_PAGES, target=TOTAL_TARGET, concurrency=8, rate=4.0,
+                 index=None, page_max_age=PAGE_MAX_AGE):
+    # rows go into the index as they arrive, so an interrupted run resumes where it stopped
+    data_list = []
+    seen = set()
+    changed = 0
+
+    def skip_fresh_page(url):
+        return index.is_fresh(url, "page", page_max_age)
+
+    def record_page(url, ads):
+        index.record(url, "page", "ok" if ads else "empty", [row[0] for row in ads])
+
+    skip_page = skip_fresh_page if index is not None else None
+    on_page = record_page if index is not None else None
+
+    async with AsyncFetcher(concurrency=concurrency, rate=rate) as fetcher:
+        async with aclosing(iter_rows(fetcher, base_url, max_pages, skip_page, on_page)) as rows:
+            async for row in rows:
+                # listings shift between pages while we scrape, so the same ad can show up twice
+                if row[0] in seen:
+                    continue
+                seen.add(row[0])
+                data_list.append(row)
+                if index is not None and row[0] and index.record(row[0], "basic", "ok", row):
+                    changed += 1
+                if target and len(data_list) >= target:
+                    break
+    return pd.DataFrame(data_list, columns=COLUMNS), changed
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Scrape listing pages from Halo Oglasi")
+    parser.add_argument("--base-url", default=BASE_URL, help="point at a local stub to test against fixtures")
+    parser.add_argument("--pages", type=int, default=MAX_PAGES, help="stop after this many pages (default: all)")
+    parser.add_argument("--limit", "--target", dest="target", type=int, default=TOTAL_TARGET,
+                        help="stop after this many ads (default: no limit)")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--rate", type=float, default=4.0, help="requests per second")
+    parser.add_argument("--output", default=OUTPUT_CSV)
+    parser.add_argument("--index", default=INDEX_DB, help="SQLite URL index used to resume and refresh")
+    parser.add_argument("--refresh", action="store_true", help="refetch pages even if fetched recently")
+    parser.add_argument("--format", choices=["parquet", "feather", "csv"], default="parquet")
+    args = parser.parse_args(argv)
 
-    if len(data_list) >= TOTAL_TARGET:
-        break
+    index = UrlIndex(args.index)
+    try:
+        df, changed = asyncio.run(scrape(args.base_url, args.pages, args.target, args.concurrency, args.rate,
+                                         index, 0 if args.refresh else PAGE_MAX_AGE))
+        # the CSV holds every ad in the index, not only the ones seen in this run
+        df_all = pd.DataFrame(list(index.payloads("basic")), columns=COLUMNS)
+    finally:
+        index.close()
+    # Details stay in their list repr, which is what data_cleaning.py parses
+    df_all["Details"] = df_all["Details"].astype(str)
+    path = write_table(df_all, args.output, args.format, typed=False)
+    print(f"Scraped {len(df)} ads ({changed} new or changed), saved {len(df_all)} ads to {path}")
 
-    time.sleep(2)  # short delay to avoid being blocked
 
-df = pd.DataFrame(data_list, columns=["URL", "Title", "Price", "Location", "Details"])
-df.to_csv("../data/raw/serbian_apartments_basic.csv", index=False, encoding="utf-8-sig")
-print(f"Saved {len(df)} ads to data/raw/serbian_apartments_raw.csv")
+if __name__ == "__main__":
+    main()
@@ -1,88 +1,229 @@
-from selenium import webdriver
-from selenium.webdriver.chrome.service import Service
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as ec
-import pandas as pd
-import time
-
-# Setup Chrome driver
-service = Service(executable_path=r"C:\Users\mperi\Downloads\chromedriver-win64\chromedriver.exe")
-options = webdriver.ChromeOptions()
-options.add_argument("--headless")
-driver = webdriver.Chrome(service=service, options=options)
-
-# Load basic CSV
-df_basic = pd.read_csv("../data/raw/serbian_apartments_basic.csv")
-
-details_list = []
-
-for index, row in df_basic.iterrows():
-    url = row["URL"]
-    try:
-        driver.get(url)
-        time.sleep(2)
+import argparse
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from contextlib import contextmanager
 
-        # Property Type
+import lxml.html
+import pandas as pd
+import requests
+from requests.adapters import HTTPAdapter
+
+from scripts.instrumentation import count, traced
+from scripts.paths import BASIC_CSV, DETAILS_CSV
+from scripts.url_index import INDEX_DB, UrlIndex, content_hash
+from preprocessing.storage import read_table, write_table
+
+OUTPUT_CSV = DETAILS_CSV
+CHROMEDRIVER = r"C:\Users\mperi\Downloads\chromedriver-win64\chromedriver.exe"
+
+FLAGS_XPATH = "//div[contains(concat(' ', normalize-space(@class), ' '), ' flags-container ')]"
+
+
+def empty_details(url):
+    return {
+        "URL": url,
+        "Type": None,
+        "Condition": None,
+        "Heating": None,
+        "Parking_garage": 0,
+        "Parking_outdoor": 0,
+    }
+
+
+def details_from_fields(url, property_type, property_condition, heating_type, labels_text):
+    details = empty_details(url)
+    details.update({
+        "Type": property_type,
+        "Condition": property_condition,
+        "Heating": heating_type,
+        "Parking_garage": 1 if any("Garaža" in x for x in labels_text) else 0,
+        "Parking_outdoor": 1 if any("Parking" in x for x in labels_text) else 0,
+    })
+    return details
+
+
+@traced()
+def parse_detail_page(url, html):
+    # read the fields straight from the static HTML; None when the page needs a browser
+    tree = lxml.html.fromstring(html)
+
+    def first_span(div_id):
+        spans = tree.xpath(f"//div[@id='{div_id}']//span")
+        return spans[0].text_content().strip() if spans else None
+
+    fields = [first_span("d2"), first_span("d3"), first_span("d4")]
+    flags = tree.xpath(FLAGS_XPATH)
+    if not flags or all(f is None for f in fields):
+        return None
+    # the flags are filled in by JavaScript on some pages, leaving an empty container in the static HTML;
+    # reading that as "no parking" would be wrong, so those pages go to the browser too
+    labels = flags[0].xpath(".//label")
+    if not labels:
+        return None
+
+    labels_text = [label.text_content().strip() for label in labels]
+    return details_from_fields(url, *fields, labels_text)
+
+
+class BrowserPool:
+    # a fixed set of headless Chrome instances shared by the fallback workers
+    def __init__(self, size, chromedriver=CHROMEDRIVER, timeout=30):
+        self.size = size
+        self.chromedriver = chromedriver
+        self.timeout = timeout
+        self._drivers = queue.Queue()
+        self._all = []
+        self._lock = threading.Lock()
+
+    def _start_driver(self):
+        from selenium import webdriver
+        from selenium.webdriver.chrome.service import Service
+
+        options = webdriver.ChromeOptions()
+        options.add_argument("--headless")
+        driver = webdriver.Chrome(service=Service(executable_path=self.chromedriver), options=options)
+        driver.set_page_load_timeout(self.timeout)
+        return driver
+
+    @contextmanager
+    def driver(self):
+        # browsers are started lazily, only once a page actually needs one
+        with self._lock:
+            if self._drivers.empty() and len(self._all) < self.size:
+                driver = self._start_driver()
+                self._all.append(driver)
+                self._drivers.put(driver)
+        driver = self._drivers.get()
         try:
-            property_type = driver.find_element(By.CSS_SELECTOR, "div#d2 span").text.strip()
-        except:
-            property_type = None
-
-        # Property Condition
+            yield driver
+        finally:
+            self._drivers.put(driver)
+
+    def fetch(self, url, flags_wait=5):
+        from selenium.webdriver.common.by import By
+        from selenium.webdriver.support.ui import WebDriverWait
+        from selenium.webdriver.support import expected_conditions as ec
+
+        def text_or_none(driver, selector):
+            try:
+                return driver.find_element(By.CSS_SELECTOR, selector).text.strip()
+            except Exception:
+                return None
+
+        with self.driver() as driver:
+            driver.get(url)
+            fields = [text_or_none(driver, f"div#{div_id} span") for div_id in ("d2", "d3", "d4")]
+            try:
+                labels = WebDriverWait(driver, flags_wait).until(
+                    ec.presence_of_all_elements_located((By.CSS_SELECTOR, "div.flags-container label"))
+                )
+                labels_text = [label.text.strip() for label in labels]
+            except Exception:
+                labels_text = []
+        return details_from_fields(url, *fields, labels_text)
+
+    def close(self):
+        for driver in self._all:
+            driver.quit()
+
+
+class DetailExtractor:
+    # static HTML fetch + parse on a bounded thread pool, browser fallback only when needed
+    def __init__(self, workers=16, browsers=2, timeout=20, chromedriver=CHROMEDRIVER):
+        self.workers = workers
+        self.timeout = timeout
+        self.session = requests.Session()
+        self.session.headers["User-Agent"] = "Mozilla/5.0"
+        adapter = HTTPAdapter(pool_connections=workers, pool_maxsize=workers)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self.browsers = BrowserPool(browsers, chromedriver, timeout) if browsers else None
+        self.stats = {"static": 0, "browser": 0, "failed": 0}
+        self._stats_lock = threading.Lock()
+
+    def _count(self, outcome):
+        with self._stats_lock:
+            self.stats[outcome] += 1
+        count(f"details.{outcome}")
+
+    @traced()
+    def extract(self, url):
+        # (status, details) for one URL; status is "ok" or "failed"
         try:
-            property_condition = driver.find_element(By.CSS_SELECTOR, "div#d3 span").text.strip()
-        except:
-            property_condition = None
+            count("http.requests")
+            resp = self.session.get(url, timeout=self.timeout)
+            resp.raise_for_status()
+            count("http.bytes", len(resp.content))
+            resp.encoding = "utf-8"
+            details = parse_detail_page(url, resp.text)
+            if details is not None:
+                self._count("static")
+                return "ok", details
+            if self.browsers is not None:
+                details = self.browsers.fetch(url)
+                self._count("browser")
+                return "ok", details
+        except Exception as e:
+            print(f"Error processing {url}: {e}")
+        self._count("failed")
+        return "failed", empty_details(url)
+
+    def extract_all(self, urls):
+        # yields (status, details) in completion order
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            futures = [pool.submit(self.extract, url) for url in urls]
+            for future in as_completed(futures):
+                yield future.result()
+
+    def close(self):
+        self.session.close()
+        if self.browsers is not None:
+            self.browsers.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Scrape detail pages for the ads in the basic CSV")
+    parser.add_argument("--input", default=BASIC_CSV)
+    parser.add_argument("--output", default=OUTPUT_CSV)
+    parser.add_argument("--workers", type=int, default=16)
+    parser.add_argument("--browsers", type=int, default=2, help="Chrome instances for JS-only pages, 0 to disable")
+    parser.add_argument("--timeout", type=float, default=20, help="per-URL timeout in seconds")
+    parser.add_argument("--chromedriver", default=CHROMEDRIVER)
+    parser.add_argument("--index", default=INDEX_DB, help="SQLite URL index used to resume and refresh")
+    parser.add_argument("--format", choices=["parquet", "feather", "csv"], default="parquet")
+    args = parser.parse_args(argv)
+
+    # Load basic CSV
+    df_basic = read_table(args.input, columns=["URL", "Title", "Price", "Location", "Details"],
+                          typed=False).dropna(subset=["URL"])
+
+    # only fetch ads that are new, failed last time, or whose listing changed since
+    index = UrlIndex(args.index)
+    source_hashes = {
+        row.URL: content_hash([str(row.Title), str(row.Price), str(row.Location), str(row.Details)])
+        for row in df_basic.itertuples(index=False)
+    }
+    todo = [url for url, h in source_hashes.items() if index.needs_fetch(url, "details", h)]
+    print(f"{len(todo)} of {len(source_hashes)} ads need details")
+
+    extractor = DetailExtractor(args.workers, args.browsers, args.timeout, args.chromedriver)
+    try:
+        for status, details in extractor.extract_all(todo):
+            index.record(details["URL"], "details", status, details, source_hash=source_hashes[details["URL"]])
+        details_list = list(index.payloads("details", statuses=("ok", "failed")))
+    finally:
+        extractor.close()
+        index.close()
 
-        # Heating Type
-        try:
-            heating_type = driver.find_element(By.CSS_SELECTOR, "div#d4 span").text.strip()
-        except:
-            heating_type = None
+    # Save to CSV
+    df_details = pd.DataFrame(details_list)
+    path = write_table(df_details, args.output, args.format)
+
+    print(f"Saved detailed info for {len(df_details)} apartments to {path} "
+          f"({extractor.stats['static']} static, {extractor.stats['browser']} browser, "
+          f"{extractor.stats['failed']} failed)")
 
-        # Parking / Garage
-        try:
-            labels = WebDriverWait(driver, 20).until(
-                ec.presence_of_all_elements_located((By.CSS_SELECTOR, "div.flags-container label"))
-            )
-            labels_text = [label.text.strip() for label in labels]
-
-            parking_garage = 1 if any("Garaža" in x for x in labels_text) else 0
-            parking_outdoor = 1 if any("Parking" in x for x in labels_text) else 0
-
-        except:
-            parking_garage = 0
-            parking_outdoor = 0
-
-        # Append to list
-        details_list.append({
-            "URL": url,
-            "Type": property_type,
-            "Condition": property_condition,
-            "Heating": heating_type,
-            "Parking_garage": parking_garage,
-            "Parking_outdoor": parking_outdoor
-        })
-
-    except Exception as e:
-        print(f"Error processing {url}: {e}")
-        details_list.append({
-            "URL": url,
-            "Property Type": None,
-            "Property Condition": None,
-            "Parking_garage": 0,
-            "Parking_outdoor": 0
-        })
-
-    time.sleep(2)
-
-# Save to CSV
-df_details = pd.DataFrame(details_list)
-df_details.to_csv("../data/raw/serbian_apartments_details.csv", index=False, encoding="utf-8-sig")
-
-print(f"Saved detailed info for {len(df_details)} apartments to serbian_apartments_details.csv")
-
-# Close the driver
-driver.quit()
 
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,162 @@
+# Synthetic Belgrade listings in the raw schema the scrapers write, for measuring how the pipeline scales
+# past the few hundred real listings. Rows follow the quirks of the scraped tables: Location strings with
+# the empty "Opština" part and street names split on commas (so "Novi Beograd" parses as "Novi"),
+# Details lists like "['64,86 m', '3.0', 'III/8']", prices like "179.900 €", blank Type/Condition/Heating,
+# a few listings without details and a few malformed Details values.
+# Seeded, so the same arguments always produce the same tables.
+#   python -m scripts.synthetic_listings --rows 1000000 --output-dir /tmp/synthetic
+import argparse
+import os
+
+import numpy as np
+import pandas as pd
+
+from preprocessing.storage import TableWriter
+from scripts.scorebook import CONDITION_MAP, HEATING_VALUES, ROMAN_MAP, TYPE_VALUES
+
+LISTING_URL = "https://www.halooglasi.com/nekretnine/prodaja-stanova/"
+FIRST_LISTING_ID = 5425600000000
+
+# municipality as it appears in the Location string: (typical EUR/m², share of listings, places)
+MUNICIPALITIES = {
+    "Voždovac": (2700, 0.20, ["Banjica", "Lekino brdo", "Darvinova pošta", "Medaković", "Braće Jerković",
+                              "Naselje , Stepa , Stepanović", "Autokomanda"]),
+    "Novi , Beograd": (3400, 0.18, ["Blok 63", "Blok 45", "Bežanijska kosa 2", "Fontana", "Belville",
+                                    "Savski nasip", "Tošin bunar"]),
+    "Zemun": (2500, 0.15, ["Gornji grad", "Altina", "Zemun Polje", "Galenika", "Kalvarija", "Batajnica"]),
+    "Zvezdara": (2600, 0.11, ["Lion", "Kluz", "Mirijevo", "Konjarnik", "Cvetkova pijaca", "Đeram"]),
+    "Čukarica": (2400, 0.09, ["Banovo brdo", "Žarkovo", "Julino brdo", "Cerak", "Sremčica"]),
+    "Stari grad": (4200, 0.07, ["Zeleni venac", "Dorćol", "Kosančićev venac", "Skadarlija", "Studentski trg"]),
+    "Savski venac": (4800, 0.05, ["Višegradska", "Beograd na vodi", "Senjak", "Dedinje", "Slavija"]),
+    "Vračar": (4000, 0.05, ["Crveni krst", "Čubura", "Neimar", "Hram Svetog Save"]),
+    "Palilula": (2500, 0.04, ["Karaburma", "Višnjička banja", "Ćalije", "Borča"]),
+    "Rakovica": (2000, 0.03, ["Rakovica (mesto)", "Kanarevo brdo", "Miljakovac", "Labudovo brdo"]),
+    "Surčin": (1700, 0.03, ["Surčin (mesto)", "Jakovo", "Bečmen"]),
+}
+STREETS = ["Milorada , Miskovica", "Ljuba , Vučkovića", "Todora , Dukina", "Jurija , Gagarina", "Brankova",
+           "Ljubinke , Bobić", "Ščerbinova", "Stevana , Lukovića", "Bulevar oslobođenja",
+           "Ugrinovački put 22. deo", "Vojislava , Ilića", "Gospodara , Vučića", "Omladinskih brigada",
+           "Cara , Dušana"]
+
+# shares of the scorebook Type/Condition/Heating values; "" is a field missing from the page
+TYPES = (TYPE_VALUES + [""], [0.47, 0.13, 0.40])
+CONDITIONS = ([c for c in CONDITION_MAP if c != "Ostalo"] + [""], [0.05, 0.13, 0.47, 0.35])
+HEATING = (HEATING_VALUES + [""], [0.30, 0.30, 0.18, 0.07, 0.04, 0.03, 0.03, 0.05])
+# price multipliers for the values above, so models have signal to find
+TYPE_EFFECT = {"Novogradnja": 1.12, "Stara gradnja": 0.92, "": 1.0}
+CONDITION_EFFECT = {c: 0.9 + 0.07 * v for c, v in CONDITION_MAP.items()} | {"": 1.0}
+
+ROOMS = np.array(["0.5", "1.0", "1.5", "2.0", "2.5", "3.0", "3.5", "4.0", "4.5", "5+"], dtype=object)
+ROMAN = {v: k for k, v in ROMAN_MAP.items()}
+TITLES = np.array(["Odličan dvosoban stan", "Četvorosoban stan na prodaju", "Lux stan, uknjižen",
+                   "Prilika! Prelep stan, top lokacija", "Novogradnja bez provizije",
+                   "Kvalitetna Novogradnja. Dvostran. Jugozapad", "Stan za renoviranje", "Garsonjera u centru",
+                   "Porodični stan sa terasom", "Hitna prodaja"], dtype=object)
+# Details values the batch parser hands to its slow path
+ODD_DETAILS = np.array(["[]", "['55 m']", "['70 m', '4+', 'PR/3', 'extra']", "['80 m', 'n/a', 'I/4']", "nan"],
+                       dtype=object)
+
+
+def _floors(rng, rows):
+    # "III/8", "PR/4", "VPR/5"; buildings of 2-25 floors, high-rises rarer
+    total = np.minimum(2 + rng.geometric(0.18, rows), 25)
+    level = rng.integers(-1, total + 1)
+    ground = np.where(rng.random(rows) < 0.5, "PR/", "VPR/")
+    roman = pd.Series(np.maximum(level, 1)).map(ROMAN).to_numpy(dtype=object)
+    labels = np.where(level <= 0, ground, roman + "/")
+    return labels + total.astype(str).astype(object), level, total
+
+
+def _choice(rng, vocabulary, rows):
+    values, weights = vocabulary
+    return np.asarray(values, dtype=object)[rng.choice(len(values), rows, p=weights)]
+
+
+def generate(rows, seed=42, start=0):
+    # (basic, details) frames for listings start .. start + rows - 1; the same listing number always
+    # gets the same row for a given seed, so tables can be built in chunks
+    rng = np.random.default_rng([seed, start])
+    names = list(MUNICIPALITIES)
+    price_per_m2, shares, places = zip(*MUNICIPALITIES.values())
+    mun = rng.choice(len(names), rows, p=np.array(shares) / sum(shares))
+
+    # Location: "Beograd, Opština , <municipality>, <place>[, <street>]"
+    place_counts = np.array([len(p) for p in places])
+    place_offsets = np.concatenate([[0], np.cumsum(place_counts)[:-1]])
+    all_places = np.array([p for group in places for p in group], dtype=object)
+    place = all_places[place_offsets[mun] + rng.integers(0, 1 << 30, rows) % place_counts[mun]]
+    street = np.asarray(STREETS, dtype=object)[rng.integers(0, len(STREETS), rows)]
+    location = "Beograd, Opština , " + np.asarray(names, dtype=object)[mun] + ", " + place
+    location = np.where(rng.random(rows) < 0.7, location + ", " + street, location)
+
+    # Details: area with a decimal comma for about a third of the listings, rooms from area, floor
+    area = np.clip(rng.lognormal(np.log(62), 0.42, rows), 14, 400)
+    area = np.where(rng.random(rows) < 0.35, np.round(area, 2), np.round(area))
+    area_text = pd.Series(area).map("{:g}".format).str.replace(".", ",", regex=False).to_numpy(dtype=object)
+    room_index = np.clip(np.round(area / 13 - 1.5 + rng.normal(0, 0.8, rows)), 0, len(ROOMS) - 1)
+    rooms = ROOMS[room_index.astype(np.intp)]
+    floor, level, total = _floors(rng, rows)
+    details = "['" + area_text + " m', '" + rooms + "', '" + floor + "']"
+    odd = rng.random(rows) < 0.002
+    details[odd] = ODD_DETAILS[rng.integers(0, len(ODD_DETAILS), odd.sum())]
+
+    property_type = _choice(rng, TYPES, rows)
+    condition = _choice(rng, CONDITIONS, rows)
+    heating = _choice(rng, HEATING, rows)
+    garage = (rng.random(rows) < 0.24).astype(np.int8)
+    outdoor = (rng.random(rows) < 0.53).astype(np.int8)
+
+    # price from the municipality level, type, condition, garage and floor, with lognormal noise
+    per_m2 = np.asarray(price_per_m2, dtype=np.float64)[mun]
+    per_m2 *= pd.Series(property_type).map(TYPE_EFFECT).to_numpy(dtype=np.float64)
+    per_m2 *= pd.Series(condition).map(CONDITION_EFFECT).to_numpy(dtype=np.float64)
+    per_m2 *= 1 + 0.06 * garage - 0.05 * (level <= 0) - 0.03 * (level == total)
+    per_m2 *= rng.lognormal(0, 0.18, rows)
+    price = np.round(per_m2 * area / 100) * 100
+    price_text = pd.Series(price.astype(np.int64)).map("{:,} €".format).str.replace(",", ".", regex=False)
+
+    ids = FIRST_LISTING_ID + start + np.arange(rows, dtype=np.int64)
+    title = TITLES[rng.integers(0, len(TITLES), rows)]
+    slug = pd.Series(title).str.lower().str.replace(r"[^a-z0-9]+", "-", regex=True).str.strip("-")
+    url = LISTING_URL + slug + "/" + ids.astype(str).astype(object) + "?kid=4"
+
+    basic = pd.DataFrame({"URL": url, "Title": title, "Price": price_text.to_numpy(dtype=object),
+                          "Location": location, "Details": details})
+
+    # the details scraper misses a few listings and finishes them in its own order
+    has_details = rng.random(rows) >= 0.03
+    order = rng.permutation(np.flatnonzero(has_details))
+    details_table = pd.DataFrame({"URL": basic["URL"].to_numpy()[order], "Type": property_type[order],
+                                  "Condition": condition[order], "Heating": heating[order],
+                                  "Parking_garage": garage[order], "Parking_outdoor": outdoor[order]})
+    return basic, details_table
+
+
+def write(rows, output_dir, seed=42, chunksize=1_000_000, fmt="csv"):
+    # serbian_apartments_basic.<fmt> and serbian_apartments_details.<fmt> in output_dir, built chunk
+    # by chunk so 10M rows don't need to fit in memory at once; returns the two paths
+    os.makedirs(output_dir, exist_ok=True)
+    basic_writer = TableWriter(os.path.join(output_dir, "serbian_apartments_basic"), fmt)
+    details_writer = TableWriter(os.path.join(output_dir, "serbian_apartments_details"), fmt)
+    for start in range(0, rows, chunksize):
+        basic, details = generate(min(chunksize, rows - start), seed, start)
+        basic_writer.write(basic)
+        details_writer.write(details)
+    basic_writer.close()
+    details_writer.close()
+    return basic_writer.path, details_writer.path
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--output-dir", required=True)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--format", choices=["csv", "parquet", "feather"], default="csv")
+    args = parser.parse_args(argv)
+    for path in write(args.rows, args.output_dir, args.seed, fmt=args.format):
+        print(f"wrote {path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+import hashlib
+import json
+import re
+import sqlite3
+import time
+
+from scripts.paths import INDEX_DB
+
+# numeric ad ID at the end of the path, e.g. .../5425645688140?kid=4
+LISTING_ID_RE = re.compile(r"/(\d+)/?(?:[?#]|$)")
+
+
+def listing_id(url):
+    match = LISTING_ID_RE.search(url or "")
+    return match.group(1) if match else None
+
+
+def content_hash(payload):
+    data = json.dumps(payload, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha1(data.encode("utf-8")).hexdigest()
+
+
+class UrlIndex:
+    # one row per (url, stage): fetch status, content hash, timestamps and the scraped payload
+    def __init__(self, path=INDEX_DB):
+        self.path = path
+        self.conn = sqlite3.connect(path)
+        self.conn.row_factory = sqlite3.Row
+        # WAL keeps every committed row on disk even if the scraper is killed mid-run
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS fetches (
+                url TEXT NOT NULL,
+                stage TEXT NOT NULL,
+                listing_id TEXT,
+                status TEXT NOT NULL,
+                content_hash TEXT,
+                source_hash TEXT,
+                first_seen REAL NOT NULL,
+                fetched_at REAL NOT NULL,
+                payload TEXT,
+                PRIMARY KEY (url, stage)
+            )
+        """)
+        self.conn.execute("CREATE INDEX IF NOT EXISTS fetches_listing ON fetches (listing_id, stage)")
+        self.conn.commit()
+
+    def get(self, url, stage):
+        return self.conn.execute(
+            "SELECT * FROM fetches WHERE url = ? AND stage = ?", (url, stage)
+        ).fetchone()
+
+    def record(self, url, stage, status, payload=None, source_hash=None):
+        # store one result as soon as it arrives; returns True when the content is new or changed
+        now = time.time()
+        new_hash = content_hash(payload) if payload is not None else None
+        previous = self.get(url, stage)
+        self.conn.execute("""
+            INSERT INTO fetches (url, stage, listing_id, status, content_hash, source_hash,
+                                 first_seen, fetched_at, payload)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT (url, stage) DO UPDATE SET
+                status = excluded.status,
+                content_hash = excluded.content_hash,
+                source_hash = excluded.source_hash,
+                fetched_at = excluded.fetched_at,
+                payload = excluded.payload
+        """, (url, stage, listing_id(url), status, new_hash, source_hash, now, now,
+              json.dumps(payload, ensure_ascii=False, default=str) if payload is not None else None))
+        self.conn.commit()
+        return previous is None or previous["content_hash"] != new_hash
+
+    def is_fresh(self, url, stage, max_age):
+        # fetched successfully within the last `max_age` seconds
+        row = self.get(url, stage)
+        return row is not None and row["status"] == "ok" and time.time() - row["fetched_at"] < max_age
+
+    def needs_fetch(self, url, stage, source_hash=None):
+        # missing, failed, or fetched from a listing that has changed since
+        row = self.get(url, stage)
+        return row is None or row["status"] != "ok" or row["source_hash"] != source_hash
+
+    def payloads(self, stage, statuses=("ok",)):
+        marks = ", ".join("?" * len(statuses))
+        cursor = self.conn.execute(
+            f"SELECT payload FROM fetches WHERE stage = ? AND status IN ({marks}) ORDER BY first_seen, url",
+            (stage, *statuses),
+        )
+        for (payload,) in cursor:
+            yield json.loads(payload)
+
+    def close(self):
+        self.conn.close()